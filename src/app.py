@@ -13,11 +13,15 @@ if script_dir not in sys.path:
 
 # --- 🏗️ ARCHITECTURAL SELF-PROVISIONING (Cloud-Resilience Layer) ---
 def ensure_logic_fabric():
-    """Checks for vectors.npy/metadata.json. Re-indexes only if missing."""
+    """Checks for a published generation, index.aev, region shards or legacy vectors.npy/metadata.json.
+    Re-indexes only if missing."""
+    g_path = os.path.join(script_dir, "..", "data", "processed", "MANIFEST.json")
+    i_path = os.path.join(script_dir, "..", "data", "processed", "index.aev")
+    s_path = os.path.join(script_dir, "..", "data", "processed", "shards")
     v_path = os.path.join(script_dir, "..", "data", "processed", "vectors.npy")
     m_path = os.path.join(script_dir, "..", "data", "processed", "metadata.json")
     
-    if not os.path.exists(v_path) or not os.path.exists(m_path):
+    if not os.path.exists(g_path) and not os.path.exists(i_path) and not os.path.isdir(s_path) and (not os.path.exists(v_path) or not os.path.exists(m_path)):
         # We wrap in a spinner so the UI stays clean during first-time cloud setup
         with st.spinner("🛡️ AETHER_VERITAS: Reconstructing Knowledge Fabric..."):
             try:
@@ -34,6 +38,7 @@ ensure_logic_fabric()
 
 try:
     from logic.resolver import AetherEngine 
+    from logic.lineage import PARENT_REGIONS
 except ImportError as e:
     st.error(f"Critical Error: Could not find AetherEngine. {e}")
     st.stop()
@@ -85,6 +90,7 @@ st.markdown("""
     </style>
     """, unsafe_allow_html=True)
 
+# The cached engine swaps in rebuilt or healed indexes on its own (see AetherEngine.reload_interval)
 @st.cache_resource
 def load_engine(): return AetherEngine()
 engine = load_engine()
@@ -108,6 +114,11 @@ with st.sidebar:
     m1.metric("Governed", governed)
     m2.metric("Escalated", escalated)
     st.metric("Self-Healed (Global)", healed_count)
+    cache_stats = engine.embedding_cache.stats()
+    st.caption(f"Embedding cache: {cache_stats['memory_hits'] + cache_stats['disk_hits']} hits / {cache_stats['misses']} misses")
+    if engine.result_cache is not None:
+        result_stats = engine.result_cache.stats()
+        st.caption(f"Result cache: {result_stats['hit_ratio']:.0%} hit ratio, {result_stats['saved_ms'] / 1000:.1f}s saved")
     
     st.divider()
 
@@ -140,11 +151,14 @@ with tab1:
             if "comprehensive" in search_terms or "deductible" in search_terms:
                 search_terms += " Physical Damage deductible"
 
-            _, _, reg_data = engine.get_aether_result(search_terms) 
-            _, _, glob_data = engine.get_aether_result("Global Base Layer Manuscript")
+            # 🛡️ One top-k scan: the winner is the regional answer; the Global slot is the best
+            # runner-up from a parent region (Global base), not just the next-best hit
+            hits = engine.get_aether_results(search_terms, k=4)
+            reg_data = hits[0][2]
+            glob_data = next((h[2] for h in hits[1:] if h[2]['metadata'].get('region') in PARENT_REGIONS), None)
             
             regional_xml = reg_data['metadata'].get('raw_xml', "MISSING_REGIONAL")
-            global_xml = glob_data['metadata'].get('raw_xml', "MISSING_GLOBAL")
+            global_xml = glob_data['metadata'].get('raw_xml', "MISSING_GLOBAL") if glob_data else "MISSING_GLOBAL"
             
             nodes_found = re.findall(r'name="([^"]+)"', regional_xml + global_xml)
             for n in nodes_found:
@@ -0,0 +1,446 @@
+import os
+import sys
+import json
+import time
+import tempfile
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import multiprocessing as mp
+import numpy as np
+
+# 🛡️ Same path anchor as the Streamlit entrypoint so `logic.*` resolves when run as a script
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from logic.search import IVFIndex, HNSWIndex, QuantizedIndex, score_rows, top_k
+from logic.shards import merge_top_k
+from logic.lexical import LexicalIndex, tokenize
+from logic.lineage import LineageResolver, PARENT_REGIONS
+from logic.embeddings import LocalEmbeddings
+from logic.store import ChunkTable, IndexFile, normalize_rows, load_vectors, save_vectors, save_metadata, save_index
+
+def _timeit(fn, repeat):
+    fn()  # warm-up (page faults, BLAS thread start)
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return float(np.median(samples)) * 1000.0
+
+def _random_matrix(n, dim, seed=0, dtype=np.float32):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((n, dim), dtype=np.float32).astype(dtype, copy=False)
+
+def bench_scoring(sizes=(10_000, 100_000, 1_000_000), dim=1536, repeat=5):
+    """Per-query latency: legacy float64 norm-per-query vs pre-normalized float32/float16."""
+    print(f"{'chunks':>10} {'legacy f64 ms':>14} {'f32 ms':>10} {'f16 ms':>10} {'f64 MB':>10} {'f32 MB':>10}")
+    for n in sizes:
+        raw = _random_matrix(n, dim, seed=n)
+        q = np.random.default_rng(1).standard_normal(dim)
+
+        legacy_ms = float("nan")
+        try:
+            legacy = raw.astype(np.float64)
+            legacy_ms = _timeit(lambda: np.dot(legacy, q) / (np.linalg.norm(legacy, axis=1) * np.linalg.norm(q)), repeat)
+            del legacy
+        except MemoryError:
+            pass
+
+        unit_q = normalize_rows(q)[0]
+        f32 = normalize_rows(raw, np.float32)
+        del raw
+        f32_ms = _timeit(lambda: score_rows(f32, unit_q), repeat)
+        f16 = f32.astype(np.float16)
+        f16_ms = _timeit(lambda: score_rows(f16, unit_q), repeat)
+        print(f"{n:>10} {legacy_ms:>14.2f} {f32_ms:>10.2f} {f16_ms:>10.2f} {n * dim * 8 / 2**20:>10.0f} {f32.nbytes / 2**20:>10.0f}")
+        del f32, f16
+
+def _synthetic_chunks(n, regions=("Global", "CA", "TX", "NY")):
+    chunks = []
+    for i in range(n):
+        region = regions[i % len(regions)]
+        name = f"Factor_{i}"
+        raw_xml = f'<Factor name="{name}" multiplier="1.{i % 100:02d}" trigger="Rule_{i}">\n' + "  <Note>synthetic</Note>\n" * 12 + "</Factor>\n"
+        chunks.append({
+            "id": f"{region}_Factor_{name}",
+            "text": f"REGION: {region} | TAG: Factor | ID: {name}",
+            "metadata": {"region": region, "name": name, "tag": "Factor", "inheritsFrom": None, "raw_xml": raw_xml},
+        })
+    return chunks
+
+def _memory_kb():
+    """(RSS, PSS) of this process in kB; PSS splits shared page-cache pages across their mappers."""
+    rss = pss = 0
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                rss = int(line.split()[1])
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    pss = int(line.split()[1])
+    except OSError:
+        pass
+    return rss, pss
+
+def _rss_worker(mode, directory, ready, release, out):
+    metadata_path = os.path.join(directory, "metadata.json")
+    vectors_path = os.path.join(directory, "vectors.npy")
+    if mode == "legacy":
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+        vectors = np.load(vectors_path)
+        q = np.ones(vectors.shape[1])
+        np.dot(vectors, q) / (np.linalg.norm(vectors, axis=1) * np.linalg.norm(q))
+    elif mode == "mmap":
+        metadata = ChunkTable.load(metadata_path)
+        vectors = load_vectors(vectors_path)
+        score_rows(vectors, normalize_rows(np.ones(vectors.shape[1]))[0])
+    else:
+        index = IndexFile(os.path.join(directory, "index.aev"))
+        metadata, vectors = index.table, index.vectors
+        top = top_k(score_rows(vectors, normalize_rows(np.ones(vectors.shape[1]))[0]), 1)[0]
+        metadata[top]["metadata"]["raw_xml"]
+    ready.release()
+    release.wait()  # hold the mapping while every sibling measures
+    out.put(_memory_kb())
+
+def bench_rss(n=100_000, dim=1536, workers=10):
+    """Per-worker RSS/PSS with every worker loaded at once: legacy json+float64, mmap float32 + JSON
+    columns, and the index container with raw XML in the blob file."""
+    ctx = mp.get_context("spawn")
+    print(f"{'mode':>8} {'workers':>8} {'RSS MB/worker':>14} {'PSS MB/worker':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        chunks = _synthetic_chunks(n)
+        raw = _random_matrix(n, dim)
+        for mode in ("legacy", "mmap", "aev"):
+            directory = os.path.join(tmp, mode)
+            os.makedirs(directory)
+            if mode == "legacy":
+                np.save(os.path.join(directory, "vectors.npy"), raw.astype(np.float64))
+                with open(os.path.join(directory, "metadata.json"), "w") as f:
+                    json.dump(chunks, f, indent=2)
+            elif mode == "mmap":
+                save_vectors(os.path.join(directory, "vectors.npy"), raw)
+                save_metadata(os.path.join(directory, "metadata.json"), chunks)
+            else:
+                save_index(os.path.join(directory, "index.aev"), chunks, raw)
+        del chunks, raw
+
+        for mode in ("legacy", "mmap", "aev"):
+            ready, release, out = ctx.Semaphore(0), ctx.Event(), ctx.Queue()
+            procs = [ctx.Process(target=_rss_worker, args=(mode, os.path.join(tmp, mode), ready, release, out)) for _ in range(workers)]
+            for p in procs:
+                p.start()
+            for _ in procs:
+                ready.acquire()
+            release.set()
+            samples = [out.get() for _ in procs]
+            for p in procs:
+                p.join()
+            rss = np.mean([s[0] for s in samples]) / 1024
+            pss = np.mean([s[1] for s in samples]) / 1024
+            print(f"{mode:>8} {workers:>8} {rss:>14.1f} {pss:>14.1f}")
+
+def _clustered_matrix(n, dim, clusters=256, spread=0.35, seed=0):
+    """Unit vectors drawn around random centers; closer to real embeddings than isotropic noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32)
+    points = centers[rng.integers(0, clusters, n)] + spread * rng.standard_normal((n, dim), dtype=np.float32)
+    return normalize_rows(points)
+
+def _exact_top(vectors, queries, k):
+    return [set(top_k(score_rows(vectors, q), k).tolist()) for q in queries]
+
+def bench_ivf(n=100_000, dim=256, nlist=None, nprobes=(1, 2, 4, 8, 16, 32), k=10, queries=200):
+    """recall@k and per-query latency of IVF at several nprobe values against exact search."""
+    vectors = _clustered_matrix(n, dim)
+    rng = np.random.default_rng(7)
+    q_mat = normalize_rows(vectors[rng.integers(0, n, queries)] + 0.2 * rng.standard_normal((queries, dim), dtype=np.float32))
+
+    t0 = time.perf_counter()
+    ivf = IVFIndex.build(vectors, nlist)
+    print(f"IVF build: {time.perf_counter() - t0:.1f}s, nlist={ivf.centroids.shape[0]}")
+
+    truth = _exact_top(vectors, q_mat, k)
+    exact_ms = _timeit(lambda: [top_k(score_rows(vectors, q), k) for q in q_mat], 1) / queries
+    print(f"{'nprobe':>8} {'recall@' + str(k):>10} {'ms/query':>10} {'speedup':>8}")
+    print(f"{'exact':>8} {1.0:>10.3f} {exact_ms:>10.3f} {1.0:>8.1f}")
+    for nprobe in nprobes:
+        found = [set(ivf.search(vectors, q, k, nprobe)[0].tolist()) for q in q_mat]
+        recall = np.mean([len(f & t) / k for f, t in zip(found, truth)])
+        ms = _timeit(lambda: [ivf.search(vectors, q, k, nprobe) for q in q_mat], 1) / queries
+        print(f"{nprobe:>8} {recall:>10.3f} {ms:>10.3f} {exact_ms / ms:>8.1f}")
+
+def bench_hnsw(n=50_000, dim=256, M=16, ef_construction=100, efs=(16, 32, 64, 128, 256), k=10, queries=200):
+    """recall@k and per-query latency of the HNSW graph at several ef values against exact search."""
+    vectors = _clustered_matrix(n, dim)
+    rng = np.random.default_rng(7)
+    q_mat = normalize_rows(vectors[rng.integers(0, n, queries)] + 0.2 * rng.standard_normal((queries, dim), dtype=np.float32))
+
+    t0 = time.perf_counter()
+    hnsw = HNSWIndex.build(vectors, M, ef_construction)
+    print(f"HNSW build: {time.perf_counter() - t0:.1f}s, M={M}, ef_construction={ef_construction}")
+
+    truth = _exact_top(vectors, q_mat, k)
+    exact_ms = _timeit(lambda: [top_k(score_rows(vectors, q), k) for q in q_mat], 1) / queries
+    print(f"{'ef':>8} {'recall@' + str(k):>10} {'ms/query':>10} {'speedup':>8}")
+    print(f"{'exact':>8} {1.0:>10.3f} {exact_ms:>10.3f} {1.0:>8.1f}")
+    for ef in efs:
+        found = [set(hnsw.search(vectors, q, k, ef)[0].tolist()) for q in q_mat]
+        recall = np.mean([len(f & t) / k for f, t in zip(found, truth)])
+        ms = _timeit(lambda: [hnsw.search(vectors, q, k, ef) for q in q_mat], 1) / queries
+        print(f"{ef:>8} {recall:>10.3f} {ms:>10.3f} {exact_ms / ms:>8.1f}")
+
+def bench_quant(n=100_000, dim=256, pq_m=None, reranks=(1, 4, 10, 20), k=10, queries=200):
+    """Hot-index memory and recall@k of int8 / PQ codes with exact re-ranking against float32."""
+    vectors = _clustered_matrix(n, dim)
+    rng = np.random.default_rng(7)
+    q_mat = normalize_rows(vectors[rng.integers(0, n, queries)] + 0.2 * rng.standard_normal((queries, dim), dtype=np.float32))
+    truth = _exact_top(vectors, q_mat, k)
+    exact_ms = _timeit(lambda: [top_k(score_rows(vectors, q), k) for q in q_mat], 1) / queries
+
+    print(f"{'index':>6} {'rerank':>7} {'B/chunk':>8} {'vs f64':>7} {'vs f32':>7} {'recall@' + str(k):>10} {'ms/query':>9}")
+    print(f"{'f32':>6} {'-':>7} {dim * 4:>8} {2.0:>7.1f} {1.0:>7.1f} {1.0:>10.3f} {exact_ms:>9.3f}")
+    for kind in ("int8", "pq"):
+        quantized = QuantizedIndex.build(vectors, kind, pq_m)
+        per_chunk = quantized.nbytes / n
+        for rerank in reranks:
+            found = [set(quantized.search(vectors, q, k, rerank)[0].tolist()) for q in q_mat]
+            recall = np.mean([len(f & t) / k for f, t in zip(found, truth)])
+            ms = _timeit(lambda: [quantized.search(vectors, q, k, rerank) for q in q_mat], 1) / queries
+            print(f"{kind:>6} {rerank:>7} {per_chunk:>8.0f} {dim * 8 / per_chunk:>7.1f} {dim * 4 / per_chunk:>7.1f} {recall:>10.3f} {ms:>9.3f}")
+
+def bench_parent(n=100_000, lookups=1_000):
+    """inheritsFrom parent resolution: linear metadata scan vs the shipped LineageResolver.find."""
+    chunks = _synthetic_chunks(n)
+    parents = [c["metadata"]["name"] for c in chunks if c["metadata"]["region"] == "Global"]
+    targets = [parents[i] for i in np.random.default_rng(3).integers(0, len(parents), lookups)]
+
+    def linear(name):
+        for entry in chunks:
+            m = entry["metadata"]
+            if m.get("name") == name and m.get("region") in ["Global", "Global_Base"]:
+                return entry
+        return None
+
+    # The maps are built lazily by the first lookup, so the cold call pays for them
+    resolver = LineageResolver.from_chunks(chunks)
+    t0 = time.perf_counter()
+    resolver.find(targets[0], PARENT_REGIONS)
+    build_ms = (time.perf_counter() - t0) * 1000
+
+    def hashed(name):
+        row = resolver.find(name, PARENT_REGIONS)
+        return chunks[row] if row is not None else None
+
+    assert all(linear(t) is hashed(t) for t in targets[:20])
+    linear_us = _timeit(lambda: [linear(t) for t in targets], 1) * 1000 / lookups
+    hashed_us = _timeit(lambda: [hashed(t) for t in targets], 1) * 1000 / lookups
+    print(f"{n} chunks, {lookups} lookups; first lookup (builds the maps) {build_ms:.1f} ms")
+    print(f"{'linear scan us/lookup':>26} {linear_us:>10.2f}")
+    print(f"{'LineageResolver us/lookup':>26} {hashed_us:>10.2f}")
+
+def _startup_worker(mode, directory, out):
+    t0 = time.perf_counter()
+    if mode == "json":
+        with open(os.path.join(directory, "metadata.json")) as f:
+            metadata = json.load(f)
+        vectors = np.load(os.path.join(directory, "vectors.npy"))
+    elif mode == "columns":
+        metadata = ChunkTable.load(os.path.join(directory, "metadata.json"))
+        vectors = load_vectors(os.path.join(directory, "vectors.npy"))
+    else:
+        index = IndexFile(os.path.join(directory, "index.aev"))
+        metadata, vectors = index.table, index.vectors
+    open_ms = (time.perf_counter() - t0) * 1000
+    t0 = time.perf_counter()
+    top = top_k(score_rows(vectors, normalize_rows(np.ones(vectors.shape[1]))[0]), 1)[0]
+    metadata[top]["metadata"]["raw_xml"]
+    query_ms = (time.perf_counter() - t0) * 1000
+    out.put((open_ms, query_ms, _memory_kb()[0]))
+
+def bench_startup(n=100_000, dim=1536, repeat=3):
+    """Engine cold start in a fresh process: indent=2 JSON + .npy vs compact JSON columns vs index.aev."""
+    ctx = mp.get_context("spawn")
+    print(f"{'format':>8} {'disk MB':>9} {'open ms':>10} {'1st query ms':>13} {'RSS MB':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        chunks = _synthetic_chunks(n)
+        raw = _random_matrix(n, dim)
+        layouts = {"json": os.path.join(tmp, "json"), "columns": os.path.join(tmp, "columns"), "aev": os.path.join(tmp, "aev")}
+        for directory in layouts.values():
+            os.makedirs(directory)
+        np.save(os.path.join(layouts["json"], "vectors.npy"), raw.astype(np.float64))
+        with open(os.path.join(layouts["json"], "metadata.json"), "w") as f:
+            json.dump(chunks, f, indent=2)
+        save_vectors(os.path.join(layouts["columns"], "vectors.npy"), raw)
+        save_metadata(os.path.join(layouts["columns"], "metadata.json"), chunks)
+        save_index(os.path.join(layouts["aev"], "index.aev"), chunks, raw)
+        del chunks, raw
+
+        for mode, directory in layouts.items():
+            disk = sum(os.path.getsize(os.path.join(directory, f)) for f in os.listdir(directory)) / 2**20
+            samples = []
+            for _ in range(repeat):
+                out = ctx.Queue()
+                p = ctx.Process(target=_startup_worker, args=(mode, directory, out))
+                p.start()
+                samples.append(out.get())
+                p.join()
+            open_ms, query_ms, rss = np.median(np.array(samples, dtype=np.float64), axis=0)
+            print(f"{mode:>8} {disk:>9.0f} {open_ms:>10.1f} {query_ms:>13.1f} {rss / 1024:>9.0f}")
+
+def bench_shards(n=1_000_000, dim=256, counts=(1, 2, 4, 8, 16, 32), k=10, queries=50):
+    """Exact top-k latency with the corpus split into N shards searched on a thread pool."""
+    vectors = _random_matrix(n, dim)
+    q_mat = normalize_rows(_random_matrix(queries, dim, seed=1))
+    print(f"{n} chunks, dim {dim}, {os.cpu_count()} cpus")
+    print(f"{'shards':>7} {'ms/query':>10} {'speedup':>8}")
+    baseline = None
+    for count in counts:
+        bounds = np.linspace(0, n, count + 1).astype(int)
+        shards = [(lo, vectors[lo:hi]) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+        def search_one(job, q):
+            base, part = job
+            sims = score_rows(part, q)
+            top = top_k(sims, k)
+            return base + top, sims[top]
+
+        with ThreadPoolExecutor(count) as pool:
+            run = lambda: [merge_top_k(list(pool.map(lambda job: search_one(job, q), shards)), k) for q in q_mat]
+            ms = _timeit(run, 3) / queries
+        baseline = baseline or ms
+        print(f"{count:>7} {ms:>10.3f} {baseline / ms:>8.2f}")
+
+def bench_lexical(n=100_000, queries=200, k=10):
+    """BM25 inverted index: build time, size and per-query candidate + re-score latency on ID queries."""
+    chunks = _synthetic_chunks(n)
+    t0 = time.perf_counter()
+    lexical = LexicalIndex.build(chunks)
+    build_s = time.perf_counter() - t0
+    nbytes = sum(a.nbytes for a in (lexical.terms, lexical.offsets, lexical.docs, lexical.weights, lexical.idf))
+    rng = np.random.default_rng(4)
+    targets = rng.integers(0, n, queries)
+    terms = [tokenize(f"what does {chunks[i]['metadata']['name']} in {chunks[i]['metadata']['region']} require") for i in targets]
+    vector_hits = [np.sort(rng.choice(n, k * 4, replace=False)) for _ in targets]
+
+    def run():
+        return [lexical.score(t, np.union1d(v, lexical.candidates(t, k * 4))) for t, v in zip(terms, vector_hits)]
+
+    found = [lexical.candidates(t, 1)[0] for t in terms]
+    us = _timeit(run, 3) * 1000 / queries
+    print(f"{n} chunks: build {build_s:.1f} s, {len(lexical.terms)} terms, {nbytes / 2**20:.1f} MB")
+    print(f"{'us/query':>10} {'exact-ID hit@1':>15}")
+    print(f"{us:>10.1f} {np.mean(np.array(found) == targets):>15.3f}")
+
+def bench_embed(n=20_000, dims=(256, 768, 1536), k=10):
+    """Offline local provider: embedding throughput and exact-ID hit@k of a query against its own chunk."""
+    chunks = _synthetic_chunks(n)
+    texts = [c["text"] for c in chunks]
+    queries = [f"what does {c['metadata']['name']} in {c['metadata']['region']} require" for c in chunks[:200]]
+    print(f"{'dim':>6} {'texts/s':>10} {'hit@' + str(k):>8}")
+    for dim in dims:
+        provider = LocalEmbeddings(dim)
+        t0 = time.perf_counter()
+        vectors = provider.embed(texts)
+        rate = n / (time.perf_counter() - t0)
+        top = [top_k(score_rows(vectors, q), k) for q in provider.embed(queries)]
+        hits = np.mean([i in t for i, t in enumerate(top)])
+        print(f"{dim:>6} {rate:>10.0f} {hits:>8.3f}")
+
+def _sizes(value):
+    return tuple(int(v) for v in value.split(","))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AETHER_VERITAS retrieval benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("scoring", help="per-query cosine scoring latency")
+    p.add_argument("--sizes", type=_sizes, default=(10_000, 100_000, 1_000_000))
+    p.add_argument("--dim", type=int, default=1536)
+    p.add_argument("--repeat", type=int, default=5)
+
+    p = sub.add_parser("rss", help="per-worker resident memory with N engines loaded")
+    p.add_argument("--chunks", type=int, default=100_000)
+    p.add_argument("--dim", type=int, default=1536)
+    p.add_argument("--workers", type=int, default=10)
+
+    p = sub.add_parser("ivf", help="IVF recall@k vs latency against exact search")
+    p.add_argument("--chunks", type=int, default=100_000)
+    p.add_argument("--dim", type=int, default=256)
+    p.add_argument("--nlist", type=int, default=None)
+    p.add_argument("--nprobe", type=_sizes, default=(1, 2, 4, 8, 16, 32))
+    p.add_argument("--k", type=int, default=10)
+    p.add_argument("--queries", type=int, default=200)
+
+    p = sub.add_parser("hnsw", help="HNSW recall@k vs latency against exact search")
+    p.add_argument("--chunks", type=int, default=50_000)
+    p.add_argument("--dim", type=int, default=256)
+    p.add_argument("--M", type=int, default=16)
+    p.add_argument("--ef-construction", type=int, default=100)
+    p.add_argument("--ef", type=_sizes, default=(16, 32, 64, 128, 256))
+    p.add_argument("--k", type=int, default=10)
+    p.add_argument("--queries", type=int, default=200)
+
+    p = sub.add_parser("quant", help="int8 / PQ memory and recall@k with exact re-ranking")
+    p.add_argument("--chunks", type=int, default=100_000)
+    p.add_argument("--dim", type=int, default=256)
+    p.add_argument("--pq-m", type=int, default=None)
+    p.add_argument("--rerank", type=_sizes, default=(1, 4, 10, 20))
+    p.add_argument("--k", type=int, default=10)
+    p.add_argument("--queries", type=int, default=200)
+
+    p = sub.add_parser("parent", help="inheritsFrom parent lookup: linear scan vs LineageResolver")
+    p.add_argument("--chunks", type=int, default=100_000)
+    p.add_argument("--lookups", type=int, default=1_000)
+
+    p = sub.add_parser("startup", help="engine cold start: JSON + .npy vs single-file index container")
+    p.add_argument("--chunks", type=int, default=100_000)
+    p.add_argument("--dim", type=int, default=1536)
+    p.add_argument("--repeat", type=int, default=3)
+
+    p = sub.add_parser("shards", help="exact search latency vs number of parallel shards")
+    p.add_argument("--chunks", type=int, default=1_000_000)
+    p.add_argument("--dim", type=int, default=256)
+    p.add_argument("--shards", type=_sizes, default=(1, 2, 4, 8, 16, 32))
+    p.add_argument("--k", type=int, default=10)
+    p.add_argument("--queries", type=int, default=50)
+
+    p = sub.add_parser("lexical", help="BM25 inverted index build and per-query latency")
+    p.add_argument("--chunks", type=int, default=100_000)
+    p.add_argument("--queries", type=int, default=200)
+    p.add_argument("--k", type=int, default=10)
+
+    p = sub.add_parser("embed", help="offline local embedding provider throughput and ID recall")
+    p.add_argument("--chunks", type=int, default=20_000)
+    p.add_argument("--dims", type=_sizes, default=(256, 768, 1536))
+    p.add_argument("--k", type=int, default=10)
+
+    args = parser.parse_args(argv)
+    if args.bench == "scoring":
+        bench_scoring(args.sizes, args.dim, args.repeat)
+    elif args.bench == "rss":
+        bench_rss(args.chunks, args.dim, args.workers)
+    elif args.bench == "ivf":
+        bench_ivf(args.chunks, args.dim, args.nlist, args.nprobe, args.k, args.queries)
+    elif args.bench == "hnsw":
+        bench_hnsw(args.chunks, args.dim, args.M, args.ef_construction, args.ef, args.k, args.queries)
+    elif args.bench == "quant":
+        bench_quant(args.chunks, args.dim, args.pq_m, args.rerank, args.k, args.queries)
+    elif args.bench == "parent":
+        bench_parent(args.chunks, args.lookups)
+    elif args.bench == "startup":
+        bench_startup(args.chunks, args.dim, args.repeat)
+    elif args.bench == "shards":
+        bench_shards(args.chunks, args.dim, args.shards, args.k, args.queries)
+    elif args.bench == "lexical":
+        bench_lexical(args.chunks, args.queries, args.k)
+    elif args.bench == "embed":
+        bench_embed(args.chunks, args.dims, args.k)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+import os
+import copy
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+
+# 🛡️ Anchored at the project root (not the cwd), so the engine and both indexers share one store
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+EMBEDDING_CACHE_PATH = os.path.join(PROJECT_ROOT, "data", "cache", "embeddings.sqlite")
+SYNONYM_CACHE_PATH = os.path.join(PROJECT_ROOT, "data", "cache", "synonyms.sqlite")
+
+class LRUCache:
+    """Thread-safe, size-bounded LRU map with hit/miss counters."""
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data), "maxsize": self.maxsize,
+            "hits": self.hits, "misses": self.misses,
+            "hit_ratio": self.hits / total if total else 0.0,
+        }
+
+class ResultCache:
+    """LRU of finished retrieval results, tracking the latency each hit saved.
+
+    Entries remember how long they took to compute; a hit adds that to `saved_ms`.
+    Callers get their own copy, so mutating a result never touches the cache.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.entries = LRUCache(maxsize)
+        self.saved_ms = 0.0
+
+    def get(self, key):
+        hit = self.entries.get(key)
+        if hit is None:
+            return None
+        results, cost_ms = hit
+        self.saved_ms += cost_ms
+        return copy.deepcopy(results)
+
+    def put(self, key, results, cost_ms):
+        self.entries.put(key, (copy.deepcopy(results), cost_ms))
+
+    def clear(self):
+        self.entries.clear()
+
+    def stats(self):
+        return {**self.entries.stats(), "saved_ms": self.saved_ms}
+
+def normalize_text(text):
+    return " ".join(str(text).split())
+
+def text_key(model, text):
+    """Content address of `text` under `model`: sha256 of the model name and whitespace-normalized text."""
+    return hashlib.sha256(f"{model}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+def _open_store(path, ddl):
+    """SQLite connection at `path` (WAL, shareable across threads) with the table of `ddl` created."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute(ddl)
+    db.commit()
+    return db
+
+class EmbeddingCache:
+    """Two-level embedding cache: in-process LRU in front of an on-disk SQLite store.
+
+    Keys are (model, text_key). Vectors are stored exactly as the provider returned
+    them (float32); callers normalize. `path=None` keeps the cache in memory only,
+    and an unwritable path degrades to memory only instead of failing the query.
+    """
+
+    def __init__(self, path=EMBEDDING_CACHE_PATH, memory_size=4096):
+        self.path = path
+        self.memory = LRUCache(memory_size)
+        self.disk_hits = 0
+        self.misses = 0
+        self._db = None
+        self._lock = threading.Lock()
+
+    def _conn(self):
+        if self._db is None and self.path:
+            try:
+                self._db = _open_store(self.path, "CREATE TABLE IF NOT EXISTS embeddings ("
+                                                  "model TEXT NOT NULL, key TEXT NOT NULL, vector BLOB NOT NULL, "
+                                                  "PRIMARY KEY (model, key))")
+            except (sqlite3.Error, OSError) as e:
+                print(f"⚠️ Embedding cache at {self.path} unavailable, memory only: {e}")
+                self.path = None
+        return self._db
+
+    def get_many(self, model, texts):
+        """Cached vectors for `texts` (None where missing), checking memory then disk."""
+        keys = [text_key(model, t) for t in texts]
+        found = [self.memory.get((model, k)) for k in keys]
+        missing = [k for k, v in zip(keys, found) if v is None]
+        if missing:
+            disk = {}
+            with self._lock:
+                db = self._conn()
+                if db is not None:
+                    for start in range(0, len(missing), 500):
+                        part = missing[start:start + 500]
+                        rows = db.execute(
+                            f"SELECT key, vector FROM embeddings WHERE model = ? AND key IN ({','.join('?' * len(part))})",
+                            [model, *part],
+                        ).fetchall()
+                        disk.update((k, np.frombuffer(v, dtype=np.float32)) for k, v in rows)
+            for i, k in enumerate(keys):
+                if found[i] is None and k in disk:
+                    found[i] = disk[k]
+                    self.memory.put((model, k), disk[k])
+                    self.disk_hits += 1
+        self.misses += sum(v is None for v in found)
+        return found
+
+    def put_many(self, model, texts, vectors):
+        rows = []
+        for text, vector in zip(texts, vectors):
+            k = text_key(model, text)
+            vector = np.asarray(vector, dtype=np.float32)
+            self.memory.put((model, k), vector)
+            rows.append((model, k, vector.tobytes()))
+        with self._lock:
+            db = self._conn()
+            if db is not None and rows:
+                try:
+                    db.executemany("INSERT OR REPLACE INTO embeddings (model, key, vector) VALUES (?, ?, ?)", rows)
+                    db.commit()
+                except sqlite3.Error as e:
+                    print(f"⚠️ Embedding cache write skipped: {e}")
+
+    def embed(self, model, texts, embed_fn):
+        """Vectors for `texts` in order; only cache misses (deduplicated) are sent to `embed_fn`."""
+        texts = list(texts)
+        found = self.get_many(model, texts)
+        pending = list(dict.fromkeys(t for t, v in zip(texts, found) if v is None))
+        if pending:
+            fresh = dict(zip(pending, np.asarray(embed_fn(pending), dtype=np.float32)))
+            self.put_many(model, pending, [fresh[t] for t in pending])
+            found = [fresh[t] if v is None else v for t, v in zip(texts, found)]
+        return np.stack(found) if found else np.zeros((0, 0), dtype=np.float32)
+
+    def stats(self):
+        memory = self.memory.stats()
+        lookups = memory["hits"] + self.disk_hits + self.misses
+        return {
+            "memory_hits": memory["hits"], "disk_hits": self.disk_hits, "misses": self.misses,
+            "memory_size": memory["size"],
+            "hit_ratio": (memory["hits"] + self.disk_hits) / lookups if lookups else 0.0,
+        }
+
+def synonym_key(model, technical_id, raw_xml):
+    return hashlib.sha256(f"{model}\0{technical_id}\0{raw_xml}".encode("utf-8")).hexdigest()
+
+class SynonymCache:
+    """On-disk LLM synonym expansions keyed by (model, sha256 of technical ID and raw XML).
+
+    Callers store only successful expansions, so a failed call is retried on the next
+    build. `path=None` or an unwritable path caches nothing.
+    """
+
+    def __init__(self, path=SYNONYM_CACHE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._db = None
+        self._lock = threading.Lock()
+
+    def _conn(self):
+        if self._db is None and self.path:
+            try:
+                self._db = _open_store(self.path, "CREATE TABLE IF NOT EXISTS synonyms ("
+                                                  "model TEXT NOT NULL, key TEXT NOT NULL, synonyms TEXT NOT NULL, "
+                                                  "PRIMARY KEY (model, key))")
+            except (sqlite3.Error, OSError) as e:
+                print(f"⚠️ Synonym cache at {self.path} unavailable, not caching: {e}")
+                self.path = None
+        return self._db
+
+    def get_many(self, model, keys):
+        """Cached synonyms for `keys` (None where missing)."""
+        found = {}
+        with self._lock:
+            db = self._conn()
+            if db is not None:
+                for start in range(0, len(keys), 500):
+                    part = keys[start:start + 500]
+                    found.update(db.execute(
+                        f"SELECT key, synonyms FROM synonyms WHERE model = ? AND key IN ({','.join('?' * len(part))})",
+                        [model, *part],
+                    ).fetchall())
+        values = [found.get(k) for k in keys]
+        misses = sum(v is None for v in values)
+        self.hits += len(values) - misses
+        self.misses += misses
+        return values
+
+    def put_many(self, model, items):
+        """Stores (key, synonyms) pairs."""
+        with self._lock:
+            db = self._conn()
+            if db is not None and items:
+                try:
+                    db.executemany("INSERT OR REPLACE INTO synonyms (model, key, synonyms) VALUES (?, ?, ?)",
+                                   [(model, k, v) for k, v in items])
+                    db.commit()
+                except sqlite3.Error as e:
+                    print(f"⚠️ Synonym cache write skipped: {e}")
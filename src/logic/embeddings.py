@@ -0,0 +1,161 @@
+import os
+import time
+import zlib
+import random
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import openai
+from openai import OpenAI
+from logic.store import normalize_rows
+from logic.lexical import tokenize
+
+# Selects the provider used to build an index: "openai" (default), "local", or a model name
+PROVIDER_ENV = "AETHER_EMBEDDINGS"
+EMBEDDING_MODEL = "text-embedding-3-small"
+LOCAL_MODEL_PREFIX = "local-ngram-"
+LOCAL_DIM = 768
+# Character n-gram sizes hashed by the local provider, on top of whole terms
+LOCAL_NGRAMS = (3, 4, 5)
+# Per-request limits of the embeddings endpoint (2048 inputs, 300k tokens), kept with headroom
+BATCH_MAX_INPUTS = 1024
+BATCH_MAX_TOKENS = 200_000
+# Token estimate without a tokenizer dependency; English prose and XML average ~4 chars per token
+CHARS_PER_TOKEN = 4
+# Concurrent requests per embed call, and attempts per batch before the build fails
+EMBED_WORKERS = 4
+EMBED_RETRIES = 5
+RETRY_BASE_DELAY = 1.0
+RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def batch_ranges(texts, max_inputs=BATCH_MAX_INPUTS, max_tokens=BATCH_MAX_TOKENS):
+    """(start, end) runs of consecutive texts, each within the input count and estimated token budget."""
+    ranges, start, tokens = [], 0, 0
+    for i, text in enumerate(texts):
+        cost = estimate_tokens(text)
+        if i > start and (i - start >= max_inputs or tokens + cost > max_tokens):
+            ranges.append((start, i))
+            start, tokens = i, 0
+        tokens += cost
+    if start < len(texts):
+        ranges.append((start, len(texts)))
+    return ranges
+
+class OpenAIEmbeddings:
+    """OpenAI embeddings endpoint; the client is created on first use, so offline runs never need a key.
+
+    Inputs are split into batches by count and estimated tokens, sent by a bounded
+    thread pool, retried with jittered exponential backoff on rate limits and transient
+    errors, and reassembled in input order.
+    """
+
+    remote = True
+
+    def __init__(self, model=EMBEDDING_MODEL, client=None, workers=EMBED_WORKERS, max_inputs=BATCH_MAX_INPUTS,
+                 max_tokens=BATCH_MAX_TOKENS, retries=EMBED_RETRIES):
+        self.model = model
+        self._client = client
+        self.workers = workers
+        self.max_inputs = max_inputs
+        self.max_tokens = max_tokens
+        self.retries = retries
+
+    @property
+    def client(self):
+        if self._client is None:
+            # Retries are ours (per batch, with backoff), so the client does not retry underneath them
+            self._client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"), max_retries=0)
+        return self._client
+
+    def _embed_batch(self, texts):
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.client.embeddings.create(input=texts, model=self.model)
+                return [d.embedding for d in response.data]
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.retries:
+                    raise
+                delay = RETRY_BASE_DELAY * 2 ** attempt * (1 + random.random())
+                print(f"⚠️ Embedding batch of {len(texts)} failed ({type(e).__name__}), retry in {delay:.1f}s")
+                time.sleep(delay)
+
+    def embed(self, texts):
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        ranges = batch_ranges(texts, self.max_inputs, self.max_tokens)
+        if len(ranges) == 1:
+            parts = [self._embed_batch(texts)]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(ranges))) as pool:
+                parts = list(pool.map(lambda r: self._embed_batch(texts[r[0]:r[1]]), ranges))
+        return np.asarray([v for part in parts for v in part], dtype=np.float32)
+
+class LocalEmbeddings:
+    """Deterministic offline embeddings: signed feature hashing of terms and character n-grams.
+
+    Terms come from the lexical tokenizer (technical IDs whole and in pieces), n-grams
+    from each "#term#". Counts are log-damped and rows unit-normalized, so cosine
+    behaves like a TF-weighted overlap score. Same text, same vector, on any machine.
+    """
+
+    remote = False
+
+    def __init__(self, dim=LOCAL_DIM):
+        self.dim = dim
+        self.model = f"{LOCAL_MODEL_PREFIX}{dim}"
+
+    def _features(self, text):
+        features = []
+        for term in tokenize(text):
+            features.append(term)
+            padded = f"#{term}#"
+            for n in LOCAL_NGRAMS:
+                features.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+        return features
+
+    def embed(self, texts):
+        texts = list(texts)
+        out = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            hashes = np.array([zlib.crc32(f.encode("utf-8")) for f in self._features(text)], dtype=np.uint64)
+            if len(hashes):
+                signs = np.where(hashes >> np.uint64(31), -1.0, 1.0)
+                out[row] = np.bincount((hashes % np.uint64(self.dim)).astype(np.intp), weights=signs, minlength=self.dim)
+        out = np.sign(out) * np.log1p(np.abs(out))
+        return normalize_rows(out) if len(texts) else out
+
+class CachedEmbeddings:
+    """`provider` behind an EmbeddingCache: a text already embedded under the same model is never re-sent."""
+
+    def __init__(self, provider, cache):
+        self.provider = provider
+        self.cache = cache
+        self.model = provider.model
+        self.remote = provider.remote
+
+    def embed(self, texts):
+        return self.cache.embed(self.model, texts, self.provider.embed)
+
+def cached(provider, cache):
+    """`provider` wrapped in `cache` when it is remote; local vectors are cheaper to recompute than to look up."""
+    if cache is None or not provider.remote:
+        return provider
+    return CachedEmbeddings(provider, cache)
+
+def provider_for_model(model):
+    """Provider that produced vectors recorded under `model`."""
+    if model.startswith(LOCAL_MODEL_PREFIX):
+        return LocalEmbeddings(int(model[len(LOCAL_MODEL_PREFIX):]))
+    return OpenAIEmbeddings(model)
+
+def get_provider(name=None):
+    """Provider named by `name` or $AETHER_EMBEDDINGS: "openai", "local", or a model name."""
+    name = name or os.getenv(PROVIDER_ENV) or "openai"
+    if name == "openai":
+        return OpenAIEmbeddings()
+    if name == "local":
+        return LocalEmbeddings()
+    return provider_for_model(name)
@@ -0,0 +1,102 @@
+import os
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from logic.store import load_index
+from logic.shards import index_dirs, index_files
+from logic.publish import current_index_dir
+from logic.embeddings import BATCH_MAX_INPUTS, EMBED_WORKERS, CachedEmbeddings
+
+# Digest of what a chunk's vector was computed from (text + raw_xml), stored per chunk
+CONTENT_HASH_FIELD = "content_hash"
+# Texts per provider call while ingesting; the provider splits each block into concurrent requests
+STREAM_EMBED_BLOCK = BATCH_MAX_INPUTS * EMBED_WORKERS
+
+def content_hash(chunk):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update((chunk.get("text") or "").encode("utf-8"))
+    digest.update(b"\0")
+    digest.update((chunk["metadata"].get("raw_xml") or "").encode("utf-8"))
+    return digest.hexdigest()
+
+def stamp_content_hashes(chunks):
+    for chunk in chunks:
+        chunk["metadata"][CONTENT_HASH_FIELD] = content_hash(chunk)
+
+def live_vectors(root, model):
+    """{content hash: vector} of the live index under `root`, from directories embedded with `model`."""
+    found = {}
+    for directory in index_dirs(current_index_dir(root)):
+        index_path = index_files(directory)[0]
+        # Legacy JSON indexes and pre-hash containers have nothing to match against
+        if not os.path.exists(index_path):
+            continue
+        table, vectors = load_index(index_path)
+        if table.attrs.get("embedding_model") != model:
+            continue
+        for row, digest in enumerate(table.column(CONTENT_HASH_FIELD)):
+            if digest:
+                found[digest] = vectors[row]
+    return found
+
+def _embed_block(provider, texts):
+    """(vectors, seconds spent in provider calls, texts sent to the provider) for one block.
+
+    Texts served by an embedding cache in front of the provider are neither timed nor sent.
+    """
+    spent = [0.0, 0]
+
+    def call(batch):
+        t0 = time.perf_counter()
+        vectors = (provider.provider if isinstance(provider, CachedEmbeddings) else provider).embed(batch)
+        spent[0] += time.perf_counter() - t0
+        spent[1] += len(batch)
+        return vectors
+
+    if isinstance(provider, CachedEmbeddings):
+        vectors = provider.cache.embed(provider.model, texts, call)
+    else:
+        vectors = call(texts)
+    return vectors, spent[0], spent[1]
+
+def embed_incremental(chunks, provider, root, block=STREAM_EMBED_BLOCK):
+    """(chunks, vectors) for an iterable of chunks: unchanged chunks reuse the live index's
+    vector, new or changed ones are embedded. Stamps each chunk's content hash.
+
+    Chunks may be a stream; misses are sent to the provider in blocks of `block` on a
+    background thread while the rest of the stream is still being produced.
+    """
+    reuse = live_vectors(root, provider.model)
+    out, missing, texts, futures = [], [], [], []
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        for chunk in chunks:
+            chunk["metadata"][CONTENT_HASH_FIELD] = content_hash(chunk)
+            if chunk["metadata"][CONTENT_HASH_FIELD] not in reuse:
+                missing.append(len(out))
+                texts.append(chunk["text"])
+                if len(texts) >= block:
+                    futures.append(pool.submit(_embed_block, provider, texts))
+                    texts = []
+            out.append(chunk)
+        if texts:
+            futures.append(pool.submit(_embed_block, provider, texts))
+        blocks = [f.result() for f in futures]
+    if not out:
+        return out, np.zeros((0, 0), dtype=np.float32)
+    fresh = [vectors for vectors, _, _ in blocks]
+    # Provider time only: parsing and synonym expansion upstream of the stream are not counted
+    elapsed = sum(seconds for _, seconds, _ in blocks)
+    sent = sum(count for _, _, count in blocks)
+    dim = fresh[0].shape[1] if fresh else len(next(iter(reuse.values())))
+    vectors = np.empty((len(out), dim), dtype=np.float32)
+    for i, chunk in enumerate(out):
+        digest = chunk["metadata"][CONTENT_HASH_FIELD]
+        if digest in reuse:
+            vectors[i] = reuse[digest]
+    if missing:
+        vectors[missing] = np.concatenate(fresh)
+    rate = f" in {elapsed:.2f} s ({sent / max(elapsed, 1e-9):.0f} chunks/s)" if sent else ""
+    print(f"🔄 {len(missing)} new or changed chunks: {sent} embedded{rate}, {len(missing) - sent} from the embedding cache; "
+          f"{len(out) - len(missing)} vectors reused from the live index")
+    return out, vectors
@@ -1,8 +1,6 @@
 import os
-import json
+import sys
 import numpy as np
-import lxml.etree as ET
-from openai import OpenAI
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,12 +13,46 @@ if "src" in BASE_DIR:
 else:
     PROJECT_ROOT = BASE_DIR
 
+SRC_DIR = os.path.join(PROJECT_ROOT, "src")
+if SRC_DIR not in sys.path:
+    sys.path.append(SRC_DIR)
+
+from logic.store import save_index, load_index
+from logic.shards import LEXICAL_FILE, index_dirs, index_files, update_side_files
+from logic.lexical import build_lexical_file
+from logic.publish import publish, publish_build
+from logic.embeddings import EMBEDDING_MODEL, cached, get_provider, provider_for_model
+from logic.cache import EMBEDDING_CACHE_PATH, EmbeddingCache
+from logic.incremental import CONTENT_HASH_FIELD, content_hash, embed_incremental
+from logic.ingest import stream_elements
+
+# Manuscript elements that become chunks
+CHUNK_TAGS = ("Coverage", "Factor")
+
 class AetherIndexer:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    def __init__(self, build_ivf=False, ivf_nlist=None, build_hnsw=False, hnsw_m=16, hnsw_ef_construction=100,
+                 quantize=None, pq_m=None, shard_by_region=False, embedding_provider=None,
+                 embedding_cache_path=EMBEDDING_CACHE_PATH):
+        # Content-addressed (model, text) -> vector store shared with the engine; None keeps it in memory
+        self.embedding_cache = EmbeddingCache(embedding_cache_path)
+        # "openai" (default), "local" (offline hashed n-grams) or $AETHER_EMBEDDINGS; recorded in the index
+        self.embeddings = cached(get_provider(embedding_provider), self.embedding_cache)
         # Paths are now dynamic but point to the same relative locations
-        self.metadata_path = os.path.join(PROJECT_ROOT, "data", "processed", "metadata.json")
-        self.vectors_path = os.path.join(PROJECT_ROOT, "data", "processed", "vectors.npy")
+        # Builds and heals publish a new generation under data/processed/generations/
+        self.index_dir = os.path.join(PROJECT_ROOT, "data", "processed")
+        # One index per region (shards/<region>/); a run only rewrites the regions it ingests
+        self.shard_by_region = shard_by_region
+        # IVF coarse index: opt-in like HNSW (approximate search can miss the governing node);
+        # "auto" builds it once the corpus reaches IVF_MIN_ROWS chunks
+        self.build_ivf = build_ivf
+        self.ivf_nlist = ivf_nlist
+        # HNSW graph: opt-in, the pure-NumPy build is an offline cost
+        self.build_hnsw = build_hnsw
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        # Quantized hot index: None, "int8" (4x smaller than float32) or "pq" (pq_m bytes per chunk)
+        self.quantize = quantize
+        self.pq_m = pq_m
         
         self.semantic_bridge = {
             "Global_Comprehensive": "Standard Base Policy, Theft, Stolen Vehicle, Fire, Flood, Vandalism, Glass Damage",
@@ -36,55 +68,69 @@ class AetherIndexer:
         }
 
     def chunk_xml(self, file_path, region):
-        tree = ET.parse(file_path)
-        chunks = []
-        for node in tree.xpath(".//Coverage | .//Factor"):
+        return list(self.iter_chunks(file_path, region))
+
+    def iter_chunks(self, file_path, region):
+        """Chunks of one manuscript, streamed as its elements close (memory bounded by one element)."""
+        for root, node, raw_xml in stream_elements(file_path, CHUNK_TAGS):
             name = node.get('name', 'Unnamed')
-            raw_xml = ET.tostring(node, encoding='unicode', pretty_print=True)
             lookup_key = f"{region}_{name}" if f"{region}_{name}" in self.semantic_bridge else name
             synonyms = self.semantic_bridge.get(lookup_key, "General Insurance Concept")
             
             searchable_text = f"DOMAIN: Insurance | REGION: {region} | TECHNICAL_ID: {name} | HUMAN_INTENT: {synonyms}"
             
-            chunks.append({
+            yield {
                 "id": f"{region}_{name}",
                 "text": searchable_text, 
                 "metadata": {
                     "region": region, 
                     "name": name, 
+                    "tag": node.tag,
                     "synonyms": synonyms,
+                    "inheritsFrom": node.get('inheritsFrom'),
+                    "manuscript": root.get('name'),
+                    "manuscriptInheritsFrom": root.get('inheritsFrom'),
                     "raw_xml": raw_xml 
                 }
-            })
-        return chunks
+            }
 
     def re_index_node(self, node_name, user_intent):
-        """🚀 TARGETED SELF-HEALING (Unchanged Logic)"""
-        if not os.path.exists(self.metadata_path) or not os.path.exists(self.vectors_path):
-            return False
-
-        with open(self.metadata_path, 'r') as f:
-            all_chunks = json.load(f)
-        vectors = np.load(self.vectors_path)
-
-        updated_index = -1
-        for i, chunk in enumerate(all_chunks):
-            if chunk['metadata']['name'] == node_name:
-                chunk['text'] += f" | HEALED_INTENT: {user_intent}"
-                updated_index = i
-                break
-
-        if updated_index != -1:
-            response = self.client.embeddings.create(
-                input=all_chunks[updated_index]['text'], 
-                model="text-embedding-3-small"
-            )
-            new_vector = response.data[0].embedding
-            vectors[updated_index] = new_vector
-            np.save(self.vectors_path, vectors)
-            with open(self.metadata_path, 'w') as f:
-                json.dump(all_chunks, f, indent=2)
-            return True
+        """🚀 TARGETED SELF-HEALING: re-embeds one node with `user_intent` appended to its text.
+
+        The healed index is published as a new generation; False if no node is named `node_name`.
+        """
+        # The live generation is carried into a staging copy, healed there and published whole;
+        # in a sharded index only the shard holding the node is rewritten
+        with publish(self.index_dir, carry=True) as staging:
+            for directory in index_dirs(staging.path):
+                index_path, metadata_path, vectors_path = index_files(directory)
+                if not os.path.exists(index_path) and (not os.path.exists(metadata_path) or not os.path.exists(vectors_path)):
+                    continue
+
+                table, vectors = load_index(index_path, metadata_path, vectors_path)
+                all_chunks = list(table)
+                vectors = np.array(vectors)
+
+                updated_index = -1
+                for i, chunk in enumerate(all_chunks):
+                    if chunk['metadata']['name'] == node_name:
+                        chunk['text'] += f" | HEALED_INTENT: {user_intent}"
+                        chunk['metadata'][CONTENT_HASH_FIELD] = content_hash(chunk)
+                        updated_index = i
+                        break
+
+                if updated_index != -1:
+                    # Healed with the model the index was built with, whatever this indexer's default
+                    provider = cached(provider_for_model(table.attrs.get("embedding_model", EMBEDDING_MODEL)),
+                                      self.embedding_cache)
+                    new_vector = provider.embed([all_chunks[updated_index]['text']])[0]
+                    vectors[updated_index] = new_vector
+                    save_index(index_path, all_chunks, vectors, dict(table.attrs, embedding_model=provider.model))
+                    build_lexical_file(os.path.join(directory, LEXICAL_FILE), all_chunks)
+                    # The carried ANN/quantized files still hold the old vector; re-index just the healed row
+                    update_side_files(directory, vectors, updated_index, self.hnsw_ef_construction)
+                    return True
+            staging.cancel()
         return False
 
     def run_indexing_pipeline(self):
@@ -94,26 +140,26 @@ class AetherIndexer:
             "CA": os.path.join(PROJECT_ROOT, "data", "manuscripts", "ca_overlay.xml")
         })
 
-    def run(self, files_config):
-        all_chunks = []
+    def _ingest(self, files_config, ingested):
         for region, path in files_config.items():
             if not os.path.exists(path): 
                 print(f"Skipping missing path: {path}")
                 continue
-            all_chunks.extend(self.chunk_xml(path, region))
+            ingested.append(region)
+            yield from self.iter_chunks(path, region)
+
+    def run(self, files_config):
+        ingested = []
+        # Chunks stream from the parser into the embedder; only new or changed ones are embedded
+        all_chunks, vectors = embed_incremental(self._ingest(files_config, ingested), self.embeddings, self.index_dir)
 
         if not all_chunks:
             return
 
-        texts = [c['text'] for c in all_chunks]
-        response = self.client.embeddings.create(input=texts, model="text-embedding-3-small")
-        vectors = [data.embedding for data in response.data]
-
-        os.makedirs(os.path.dirname(self.metadata_path), exist_ok=True)
-        np.save(self.vectors_path, np.array(vectors))
-        with open(self.metadata_path, "w") as f:
-            json.dump(all_chunks, f, indent=2)
-            
+        publish_build(self.index_dir, all_chunks, vectors, ingested, self.shard_by_region, build_ivf=self.build_ivf,
+                      ivf_nlist=self.ivf_nlist, build_hnsw=self.build_hnsw, hnsw_m=self.hnsw_m,
+                      hnsw_ef_construction=self.hnsw_ef_construction, quantize=self.quantize, pq_m=self.pq_m,
+                      attrs={"embedding_model": self.embeddings.model})
         print("✅ Indexing Complete.")
 
 if __name__ == "__main__":
@@ -0,0 +1,47 @@
+import lxml.etree as ET
+
+def stream_elements(path, tags):
+    """Yields (root, element, raw_xml) for every `tags` element of the XML at `path`, in document order.
+
+    Built on iterparse: each outermost matching element is serialized, handed out
+    and then cleared together with its finished siblings, so memory stays bounded by
+    the largest matching subtree instead of the whole document. Nested matches come
+    out with their ancestor, in the same order (and with the same text, tail
+    included) as an XPath query over a fully parsed tree. `root` keeps its attributes.
+    """
+    tags = set(tags)
+    root, depth, pending, last = None, 0, [], None
+    for event, elem in ET.iterparse(path, events=("start", "end")):
+        # The previous end's tail is only complete once the parser has moved past it
+        if last is not None:
+            yield from _finish(root, last, tags, depth, pending)
+            last = None
+        if event == "start":
+            if root is None:
+                root = elem
+            elif elem.tag in tags:
+                depth += 1
+                pending.append([elem, None])
+        else:
+            if elem is not root and elem.tag in tags:
+                depth -= 1
+            last = elem
+    if last is not None:
+        yield from _finish(root, last, tags, depth, pending)
+
+def _finish(root, elem, tags, depth, pending):
+    if elem is not root and elem.tag in tags:
+        for slot in reversed(pending):
+            if slot[0] is elem:
+                slot[1] = ET.tostring(elem, encoding="unicode", pretty_print=True)
+                break
+    if depth:
+        return
+    for node, raw_xml in pending:
+        yield root, node, raw_xml
+    pending.clear()
+    if elem is not root:
+        elem.clear()
+        parent = elem.getparent()
+        while elem.getprevious() is not None:
+            del parent[0]
@@ -0,0 +1,144 @@
+import re
+import hashlib
+import numpy as np
+from logic.search import save_npz, top_k
+
+# BM25 (Lucene flavour, non-negative idf)
+BM25_K1 = 1.2
+BM25_B = 0.75
+# Terms in more than this share of chunks only re-score candidates, they never nominate them
+CANDIDATE_DF_SHARE = 0.05
+CANDIDATE_DF_MIN = 1000
+
+# Technical IDs keep their separators as one compound term (CA_LIA_Program, GLB-PN-001)
+TOKEN_RE = re.compile(r"[A-Za-z0-9]+(?:[-_.][A-Za-z0-9]+)*")
+PART_RE = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z]+|\d+")
+SEPARATOR_RE = re.compile(r"[-_.]")
+# XML attributes whose values are identifiers worth matching exactly (form ids, parent refs)
+IDENTIFIER_RE = re.compile(r'\b(?:id|name|parentRef|inheritsFrom)="([^"]+)"')
+
+def tokenize(text):
+    """Lower-cased terms of `text`: every ID as one compound term (separators folded to "_")
+    plus its pieces, with camelCase split (SafeDriver -> safedriver, safe, driver)."""
+    terms = []
+    for token in TOKEN_RE.findall(str(text)):
+        pieces = [p.lower() for part in SEPARATOR_RE.split(token) for p in PART_RE.findall(part)]
+        terms.append("_".join(SEPARATOR_RE.split(token.lower())))
+        if len(pieces) > 1:
+            terms.extend(pieces)
+    return terms
+
+def identifier_terms(text):
+    """Terms of `text` that look like technical IDs (compound with "_"/"-"/".", or containing a digit).
+
+    Only these fuse into a query's score: plain words such as "discount" or "global"
+    occur across many nodes and would lift unrelated chunks over the gap threshold.
+    """
+    return [t for t in tokenize(text) if "_" in t or any(ch.isdigit() for ch in t)]
+
+def document_terms(chunk):
+    """Terms of a chunk: searchable text, id, name and the identifiers inside its XML."""
+    metadata = chunk["metadata"]
+    parts = [chunk.get("text") or "", chunk["id"], metadata.get("name") or ""]
+    parts.extend(IDENTIFIER_RE.findall(metadata.get("raw_xml") or ""))
+    return tokenize(" ".join(parts))
+
+def term_hash(term):
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+
+class LexicalIndex:
+    """BM25 inverted index in CSR form.
+
+    Terms are 64-bit hashes in a sorted array (no vocabulary strings kept); each term's
+    postings are chunk rows in ascending order with their precomputed BM25 weight.
+    Scores are normalized by the query's score on a chunk holding each term once at
+    average length (capped at 1), so an exact ID match scores about 1.
+    """
+
+    def __init__(self, terms, offsets, docs, weights, idf, n_rows):
+        self.terms = terms
+        self.offsets = offsets
+        self.docs = docs
+        self.weights = weights
+        self.idf = idf
+        self.n_rows = n_rows
+
+    @classmethod
+    def build(cls, chunks):
+        hashes, docs, tfs, lengths = [], [], [], np.zeros(len(chunks), dtype=np.float32)
+        for row, chunk in enumerate(chunks):
+            counts = {}
+            for term in document_terms(chunk):
+                counts[term] = counts.get(term, 0) + 1
+            lengths[row] = sum(counts.values())
+            hashes.extend(term_hash(t) for t in counts)
+            docs.extend([row] * len(counts))
+            tfs.extend(counts.values())
+        hashes = np.array(hashes, dtype=np.uint64)
+        docs = np.array(docs, dtype=np.int32)
+        tfs = np.array(tfs, dtype=np.float32)
+        order = np.lexsort((docs, hashes))
+        hashes, docs, tfs = hashes[order], docs[order], tfs[order]
+        terms, starts, df = np.unique(hashes, return_index=True, return_counts=True)
+        offsets = np.append(starts, len(hashes)).astype(np.int64)
+
+        n = len(chunks)
+        idf = np.log1p((n - df + 0.5) / (df + 0.5)).astype(np.float32)
+        avgdl = float(lengths.mean()) if n else 1.0
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[docs] / max(avgdl, 1e-9))
+        weights = np.repeat(idf, df) * tfs * (BM25_K1 + 1) / (tfs + norm)
+        return cls(terms, offsets, docs, weights.astype(np.float32), idf, n)
+
+    def save(self, path):
+        save_npz(path, terms=self.terms, offsets=self.offsets, docs=self.docs, weights=self.weights,
+                 idf=self.idf, n_rows=np.array(self.n_rows))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["terms"], data["offsets"], data["docs"], data["weights"], data["idf"], int(data["n_rows"]))
+
+    def _lookup(self, terms):
+        """Vocabulary positions of the distinct query terms present in the index."""
+        hashes = np.unique(np.array([term_hash(t) for t in terms], dtype=np.uint64))
+        if not len(hashes) or not len(self.terms):
+            return np.empty(0, dtype=np.intp)
+        pos = np.minimum(np.searchsorted(self.terms, hashes), len(self.terms) - 1)
+        return pos[self.terms[pos] == hashes]
+
+    def _max_score(self, pos):
+        # Every term once in an average-length chunk; a repeated term can only saturate at 1
+        return float(self.idf[pos].sum())
+
+    def candidates(self, terms, k, rows=None):
+        """Rows of the k best BM25 matches on the query's selective terms (among sorted `rows`)."""
+        pos = self._lookup(terms)
+        df = self.offsets[pos + 1] - self.offsets[pos]
+        pos = pos[df <= max(CANDIDATE_DF_MIN, int(self.n_rows * CANDIDATE_DF_SHARE))]
+        if not len(pos):
+            return np.empty(0, dtype=np.intp)
+        docs = np.concatenate([self.docs[self.offsets[p]:self.offsets[p + 1]] for p in pos])
+        weights = np.concatenate([self.weights[self.offsets[p]:self.offsets[p + 1]] for p in pos])
+        if rows is not None:
+            keep = rows[np.minimum(np.searchsorted(rows, docs), len(rows) - 1)] == docs
+            docs, weights = docs[keep], weights[keep]
+        found, inverse = np.unique(docs, return_inverse=True)
+        scores = np.bincount(inverse, weights, minlength=len(found))
+        return np.sort(found[top_k(scores, k)]).astype(np.intp)
+
+    def score(self, terms, rows):
+        """Normalized BM25 score in [0, 1] of the query for each of `rows`."""
+        pos = self._lookup(terms)
+        scores = np.zeros(len(rows), dtype=np.float32)
+        if not len(pos) or not len(rows):
+            return scores
+        for p in pos:
+            docs = self.docs[self.offsets[p]:self.offsets[p + 1]]
+            at = np.searchsorted(docs, rows)
+            hit = at < len(docs)
+            hit[hit] = docs[at[hit]] == rows[hit]
+            scores[hit] += self.weights[self.offsets[p] + at[hit]]
+        return np.minimum(scores / max(self._max_score(pos), 1e-9), 1.0)
+
+def build_lexical_file(path, chunks):
+    LexicalIndex.build(chunks).save(path)
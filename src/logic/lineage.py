@@ -0,0 +1,164 @@
+PARENT_REGIONS = ("Global", "Global_Base")
+
+def format_lineage(entries, cycle_at=None):
+    """DATA_SOURCE_LINEAGE block for [(name, region, raw_xml)] ordered root first, leaf last.
+
+    A global parent with one child renders exactly as the original two-source block.
+    """
+    root_name, root_region, root_xml = entries[0]
+    base_label = "GLOBAL_BASE_LAYER" if root_region in PARENT_REGIONS else "INHERITED_BASE_LAYER"
+    parts = [
+        f"### DATA_SOURCE_LINEAGE ###\n\n"
+        f"[[ SOURCE_A: {base_label} ]]\n"
+        f"ENTITY: {root_name}\n"
+        f"CONTENT:\n{root_xml}\n\n"
+    ]
+    for i, (name, region, raw_xml) in enumerate(entries[1:], start=1):
+        label = "REGIONAL_OVERLAY" if i == len(entries) - 1 else "INTERMEDIATE_OVERLAY"
+        parts.append(
+            f"[[ SOURCE_{chr(ord('A') + i)}: {label} ]]\n"
+            f"ENTITY: {name}\n"
+            f"REGION: {region}\n"
+            f"CONTENT:\n{raw_xml}\n\n"
+        )
+    if cycle_at is not None:
+        parts.append(f"[[ LINEAGE_WARNING: CYCLE_DETECTED AT {cycle_at} ]]\n\n")
+    parts.append("### END_LINEAGE_DATA ###")
+    return "".join(parts)
+
+class LineageResolver:
+    """Walks `inheritsFrom` chains of any depth (state -> country -> global).
+
+    A node's parent is looked up in its own region, then along the region chain
+    derived from `<Manuscript inheritsFrom>` (each manuscript's region inherits from
+    the region of its parent manuscript), then in the Global layers. Cycles stop the
+    walk. Each node's rendered lineage is memoized per (index version, row).
+    The lookup maps are built on first use, so opening an index stays cheap.
+    """
+
+    def __init__(self, regions, names, inherits, raw_xml, manuscripts=None, manuscript_parents=None, version=None,
+                 precomputed=None):
+        self.regions = regions
+        self.names = names
+        self.inherits = inherits
+        self.raw_xml = raw_xml
+        self.version = version
+        # Lineage blocks materialized by the indexer; rows without one fall back to the walk
+        self.precomputed = precomputed
+        self.manuscripts = manuscripts
+        self.manuscript_parents = manuscript_parents
+        self._memo = {}
+        # Name and region-chain maps are built on the first walk; precomputed lineage never needs them
+        self._by_region_name = None
+        self._by_name = None
+        self._region_parent = None
+
+    def _build_maps(self):
+        by_region_name, by_name = {}, {}
+        for row, key in enumerate(zip(self.regions, self.names)):
+            by_region_name.setdefault(key, row)
+            by_name.setdefault(key[1], []).append(row)
+
+        region_parent = {}
+        if self.manuscripts is not None and self.manuscript_parents is not None:
+            manuscript_region = {}
+            for region, manuscript in zip(self.regions, self.manuscripts):
+                if manuscript is not None:
+                    manuscript_region.setdefault(manuscript, region)
+            for region, parent in zip(self.regions, self.manuscript_parents):
+                parent_region = manuscript_region.get(parent)
+                if parent_region is not None and parent_region != region:
+                    region_parent.setdefault(region, parent_region)
+        self._by_region_name, self._by_name, self._region_parent = by_region_name, by_name, region_parent
+
+    @property
+    def by_region_name(self):
+        if self._by_region_name is None:
+            self._build_maps()
+        return self._by_region_name
+
+    @property
+    def by_name(self):
+        if self._by_name is None:
+            self._build_maps()
+        return self._by_name
+
+    @property
+    def region_parent(self):
+        if self._region_parent is None:
+            self._build_maps()
+        return self._region_parent
+
+    @classmethod
+    def from_table(cls, table, version=None):
+        return cls(table.column("region"), table.column("name"), table.column("inheritsFrom"),
+                   table.column("raw_xml"), table.column("manuscript"),
+                   table.column("manuscriptInheritsFrom"), version, table.column("lineage"))
+
+    @classmethod
+    def from_chunks(cls, chunks, version=None):
+        column = lambda key: [c["metadata"].get(key) for c in chunks]
+        return cls(column("region"), column("name"), column("inheritsFrom"), column("raw_xml"),
+                   column("manuscript"), column("manuscriptInheritsFrom"), version)
+
+    def region_chain(self, region):
+        chain = [region]
+        while self.region_parent.get(chain[-1]) is not None and self.region_parent[chain[-1]] not in chain:
+            chain.append(self.region_parent[chain[-1]])
+        return chain + [r for r in PARENT_REGIONS if r not in chain]
+
+    def find(self, name, regions=PARENT_REGIONS, exclude=()):
+        """First row named `name` in the first of `regions` that has one (rows in `exclude` skipped)."""
+        for region in regions:
+            row = self.by_region_name.get((region, name))
+            if row is not None and row in exclude:
+                row = next((r for r in self.by_name.get(name, ()) if self.regions[r] == region and r not in exclude), None)
+            if row is not None:
+                return row
+        return None
+
+    def chain(self, row):
+        """Rows from `row` up to its root ancestor, and the name a cycle was detected at (or None)."""
+        rows = [row]
+        while self.inherits[rows[-1]]:
+            name = self.inherits[rows[-1]]
+            parent = self.find(name, self.region_chain(self.regions[rows[-1]]), exclude=(rows[-1],))
+            if parent is None:
+                break
+            if parent in rows:
+                print(f"⚠️ Inheritance cycle at {name} (row {parent}); lineage truncated")
+                return rows, name
+            rows.append(parent)
+        return rows, None
+
+    def lineage(self, row):
+        """Rendered lineage block for `row`, or None when it has no resolvable parent."""
+        if self.precomputed is not None and self.precomputed[row] is not None:
+            return self.precomputed[row]
+        key = (self.version, int(row))
+        if key in self._memo:
+            return self._memo[key]
+        rows, cycle_at = self.chain(int(row))
+        block = None
+        if len(rows) > 1:
+            entries = [(self.names[r], self.regions[r], self.raw_xml[r]) for r in reversed(rows)]
+            # The root entity is named as the child referenced it, as the original block did
+            entries[0] = (self.inherits[rows[-2]], entries[0][1], entries[0][2])
+            block = format_lineage(entries, cycle_at)
+        self._memo[key] = block
+        return block
+
+def materialize_lineage(chunks):
+    """Stores the resolved lineage block as metadata["lineage"] on every chunk that inherits.
+
+    Run by the indexers right before the index is written, so query-time lineage is a
+    lookup and every worker serves the same bytes.
+    """
+    resolver = LineageResolver.from_chunks(chunks)
+    for row, chunk in enumerate(chunks):
+        chunk["metadata"].pop("lineage", None)
+        if chunk["metadata"].get("inheritsFrom"):
+            block = resolver.lineage(row)
+            if block is not None:
+                chunk["metadata"]["lineage"] = block
+    return chunks
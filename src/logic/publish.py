@@ -0,0 +1,134 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+from contextlib import contextmanager
+from logic.shards import SHARDS_DIR, VERSION_FILES, drop_shards, group_by_region, shard_dir, write_index
+from logic.lineage import materialize_lineage
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-writer by convention
+    fcntl = None
+
+# <root>/MANIFEST.json names the live generation; every generation is an immutable index
+# directory <root>/generations/gen-NNNNNN published by a single rename
+MANIFEST_FILE = "MANIFEST.json"
+GENERATIONS_DIR = "generations"
+LOCK_FILE = ".publish.lock"
+# Published generations kept on disk, so readers that just read the manifest can still open theirs
+KEEP_GENERATIONS = 3
+
+def read_manifest(root):
+    try:
+        with open(os.path.join(root, MANIFEST_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def manifest_index_dir(root, manifest):
+    """Directory of the generation `manifest` names, or `root` itself for an index published in place."""
+    if manifest.get("path"):
+        return os.path.join(root, manifest["path"])
+    return root
+
+def current_index_dir(root):
+    return manifest_index_dir(root, read_manifest(root))
+
+def _write_manifest(root, generation, path):
+    manifest = {"generation": generation, "path": os.path.relpath(path, root), "published_at": time.time()}
+    tmp = os.path.join(root, f"{MANIFEST_FILE}.tmp-{os.getpid()}")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, os.path.join(root, MANIFEST_FILE))
+
+@contextmanager
+def _publish_lock(root):
+    with open(os.path.join(root, LOCK_FILE), "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def _seed(source, staging):
+    """Hard-links the index files of `source` into `staging`; published files are never rewritten in place."""
+    for name in os.listdir(source):
+        path = os.path.join(source, name)
+        if name == SHARDS_DIR and os.path.isdir(path):
+            shutil.copytree(path, os.path.join(staging, name), copy_function=os.link)
+        elif os.path.isfile(path) and (name in VERSION_FILES or name.endswith(".blobs")):
+            os.link(path, os.path.join(staging, name))
+
+def _prune(root, generation, keep):
+    generations = os.path.join(root, GENERATIONS_DIR)
+    for name in os.listdir(generations):
+        path = os.path.join(generations, name)
+        if name.startswith(".staging-"):
+            # Left by a build that died; the publish lock says nobody is writing it
+            shutil.rmtree(path, ignore_errors=True)
+        elif name.startswith("gen-") and name[4:].isdigit() and int(name[4:]) <= generation - keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+class Staging:
+    """Directory a build writes into; published on exit unless cancelled."""
+
+    def __init__(self, path):
+        self.path = path
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+@contextmanager
+def publish(root, carry=False, keep=KEEP_GENERATIONS):
+    """Builds the next index generation in a staging directory and publishes it atomically.
+
+    `carry` seeds the staging directory with the live generation (hard links) for
+    partial rebuilds. On exit the directory is renamed to gen-NNNNNN and MANIFEST.json
+    is replaced in one step, so readers see either the old or the new generation,
+    never a mix. Writers are serialized by a lock file; readers take no lock.
+    """
+    generations = os.path.join(root, GENERATIONS_DIR)
+    os.makedirs(generations, exist_ok=True)
+    with _publish_lock(root):
+        staging = Staging(tempfile.mkdtemp(prefix=".staging-", dir=generations))
+        try:
+            if carry:
+                _seed(current_index_dir(root), staging.path)
+            yield staging
+        except BaseException:
+            shutil.rmtree(staging.path, ignore_errors=True)
+            raise
+        if staging.cancelled:
+            shutil.rmtree(staging.path, ignore_errors=True)
+            return
+        generation = read_manifest(root).get("generation", 0) + 1
+        target = os.path.join(generations, f"gen-{generation:06d}")
+        os.rename(staging.path, target)
+        _write_manifest(root, generation, target)
+        _prune(root, generation, keep)
+        print(f"📦 Published index generation {generation}")
+
+def publish_build(root, chunks, vectors, ingested, shard_by_region=False, **options):
+    """Publishes one indexer run as the next generation; `options` go to every `write_index`.
+
+    A sharded run starts from the live generation, so regions it did not ingest carry
+    over and ingested regions that produced no chunks are dropped. Lineage crosses
+    shards, so it is only materialized into a single index; the engine resolves it at
+    query time otherwise.
+    """
+    with publish(root, carry=shard_by_region) as staging:
+        if shard_by_region:
+            shards = group_by_region(chunks, vectors)
+            drop_shards(staging.path, [r for r in ingested if r not in shards])
+            for region, (region_chunks, region_vectors) in shards.items():
+                write_index(shard_dir(staging.path, region), region_chunks, region_vectors, **options)
+        else:
+            materialize_lineage(chunks)
+            write_index(staging.path, chunks, vectors, **options)
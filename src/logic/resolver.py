@@ -1,17 +1,71 @@
 import os
 import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import lxml.etree as ET
 from openai import OpenAI
 from dotenv import load_dotenv
+from logic.store import normalize_rows, load_index
+from logic.cache import (EMBEDDING_CACHE_PATH, SYNONYM_CACHE_PATH, EmbeddingCache, LRUCache, ResultCache, SynonymCache,
+                         normalize_text, synonym_key)
+from logic.lineage import LineageResolver, PARENT_REGIONS
+from logic.search import IVFIndex, HNSWIndex, QuantizedIndex, score_rows, take_rows, top_k, top_k_rows
+from logic.lexical import LexicalIndex, identifier_terms
+from logic.embeddings import EMBEDDING_MODEL, cached, get_provider, provider_for_model
+from logic.incremental import CONTENT_HASH_FIELD, embed_incremental
+from logic.ingest import stream_elements
+from logic.shards import LEXICAL_FILE, ShardedTable, directory_version, index_dirs, index_files, merge_top_k
+from logic.publish import manifest_index_dir, publish_build, read_manifest
 
 load_dotenv()
 
+SYNONYM_MODEL = "gpt-4o-mini"
+# Used when the LLM is unavailable or fails; never cached, so the node is retried on the next build
+SYNONYM_FALLBACK = "General Insurance"
+# Concurrent chat completions while ingesting a manuscript
+SYNONYM_WORKERS = 8
+# Nodes expanded per round while a manuscript streams in
+SYNONYM_STREAM_GROUP = 256
+# 🛡️ SENTINEL UPDATE: Broadened to see Governance_Rules and LOB_Configuration
+CHUNK_TAGS = ("Coverage", "Factor", "Governance_Rules", "LOB_Configuration")
+
+def _synonym_csv(answer):
+    """CSV text of one batched JSON answer; anything else is a miss (None, never cached, retried next build)."""
+    if isinstance(answer, list) and answer and all(isinstance(v, str) for v in answer):
+        return ", ".join(v.strip() for v in answer)
+    if isinstance(answer, str) and answer.strip():
+        return answer
+    return None
+
 class AetherIndexer:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.metadata_path = "data/processed/metadata.json"
-        self.vectors_path = "data/processed/vectors.npy"
+    def __init__(self, build_ivf=False, ivf_nlist=None, build_hnsw=False, hnsw_m=16, hnsw_ef_construction=100,
+                 quantize=None, pq_m=None, shard_by_region=False, embedding_provider=None,
+                 embedding_cache_path=EMBEDDING_CACHE_PATH, synonym_cache_path=SYNONYM_CACHE_PATH,
+                 synonym_workers=SYNONYM_WORKERS, synonym_batch=1):
+        # Synonym expansion only; without a key every node gets the generic synonym set
+        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY")) if os.getenv("OPENAI_API_KEY") else None
+        # Expansions keyed by (technical ID, raw XML): unchanged nodes never reach the LLM again
+        self.synonym_cache = SynonymCache(synonym_cache_path)
+        # Bounded pool of concurrent prompts; synonym_batch > 1 expands that many nodes per prompt
+        self.synonym_workers = synonym_workers
+        self.synonym_batch = max(1, synonym_batch)
+        # Content-addressed (model, text) -> vector store shared with the engine; None keeps it in memory
+        self.embedding_cache = EmbeddingCache(embedding_cache_path)
+        # "openai" (default), "local" (offline hashed n-grams) or $AETHER_EMBEDDINGS; recorded in the index
+        self.embeddings = cached(get_provider(embedding_provider), self.embedding_cache)
+        # Opt-in side indexes, as in logic.indexer: IVF (True or "auto"), HNSW, int8/PQ codes
+        self.build_ivf = build_ivf
+        self.ivf_nlist = ivf_nlist
+        self.build_hnsw = build_hnsw
+        self.hnsw_m = hnsw_m
+        self.hnsw_ef_construction = hnsw_ef_construction
+        self.quantize = quantize
+        self.pq_m = pq_m
+        # One index per region (shards/<region>/); a run only rewrites the regions it ingests
+        self.shard_by_region = shard_by_region
+        # Each run publishes a new generation under data/processed/generations/
+        self.index_dir = "data/processed"
         
         self.semantic_bridge = {
             "Global_Base_Comprehensive": "Standard Base Policy, theft, fire, $500 deductible, master rules",
@@ -19,120 +73,570 @@ class AetherIndexer:
             "Governance_Rules": "Effective dates, Factor Precedence, Global Discount Caps, system metadata"
         }
 
-    def _expand_synonyms(self, technical_id, xml_content):
-        try:
-            prompt = f"Identify insurance synonyms for: '{technical_id}'. XML: {xml_content[:300]}. Format: CSV list only."
+    def _synonym_prompt(self, technical_id, xml_content):
+        return f"Identify insurance synonyms for: '{technical_id}'. XML: {xml_content[:300]}. Format: CSV list only."
+
+    def _ask_synonyms(self, nodes):
+        """LLM expansions of [(technical_id, xml)]; a batch is one numbered prompt answered as JSON."""
+        if len(nodes) == 1:
             res = self.client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}],
+                model=SYNONYM_MODEL,
+                messages=[{"role": "user", "content": self._synonym_prompt(*nodes[0])}],
                 max_tokens=100, temperature=0.3
             )
-            return res.choices[0].message.content
-        except: return "General Insurance"
+            return [res.choices[0].message.content]
+        listing = "\n".join(f"{i}. {self._synonym_prompt(*node)}" for i, node in enumerate(nodes, 1))
+        res = self.client.chat.completions.create(
+            model=SYNONYM_MODEL,
+            messages=[{"role": "user", "content": "Answer each numbered request. Reply with a JSON object mapping "
+                                                  f"each number to its CSV list only.\n{listing}"}],
+            max_tokens=100 * len(nodes), temperature=0.3, response_format={"type": "json_object"}
+        )
+        answers = json.loads(res.choices[0].message.content)
+        return [_synonym_csv(answers.get(str(i))) for i in range(1, len(nodes) + 1)]
+
+    def _fetch_synonyms(self, nodes):
+        try:
+            return self._ask_synonyms(nodes)
+        except Exception as e:
+            print(f"⚠️ Synonym expansion failed for {len(nodes)} node(s): {type(e).__name__}")
+            return [None] * len(nodes)
+
+    def expand_synonyms_many(self, nodes):
+        """Synonyms for [(technical_id, raw_xml)] in order: cached ones from disk, the rest fetched concurrently."""
+        keys = [synonym_key(SYNONYM_MODEL, t, x) for t, x in nodes]
+        found = self.synonym_cache.get_many(SYNONYM_MODEL, keys)
+        pending = {}
+        for key, node, value in zip(keys, nodes, found):
+            if value is None:
+                pending.setdefault(key, node)
+        if pending and self.client is not None:
+            order = list(pending)
+            groups = [order[i:i + self.synonym_batch] for i in range(0, len(order), self.synonym_batch)]
+            with ThreadPoolExecutor(max_workers=min(self.synonym_workers, len(groups))) as pool:
+                answers = list(pool.map(lambda group: self._fetch_synonyms([pending[k] for k in group]), groups))
+            fetched = {k: v for group, values in zip(groups, answers) for k, v in zip(group, values) if v}
+            self.synonym_cache.put_many(SYNONYM_MODEL, list(fetched.items()))
+            found = [fetched.get(k) if v is None else v for k, v in zip(keys, found)]
+        return [v or SYNONYM_FALLBACK for v in found]
+
+    def _expand_synonyms(self, technical_id, xml_content):
+        return self.expand_synonyms_many([(technical_id, xml_content)])[0]
 
     def chunk_xml(self, file_path, region):
-        tree = ET.parse(file_path)
-        chunks = []
-        # 🛡️ SENTINEL UPDATE: Broadened XPath to see Governance_Rules and LOB_Configuration
-        query = ".//Coverage | .//Factor | .//Governance_Rules | .//LOB_Configuration"
-        
-        for node in tree.xpath(query):
-            name = node.get('name', node.tag) # Fallback to tag name for metadata nodes
-            inherits = node.get('inheritsFrom', None)
-            raw_xml = ET.tostring(node, encoding='unicode', pretty_print=True)
-            
+        return list(self.iter_chunks(file_path, region))
+
+    def iter_chunks(self, file_path, region):
+        """Chunks of one manuscript, streamed as its elements close; synonyms are expanded per group of nodes."""
+        group = []
+        for root, node, raw_xml in stream_elements(file_path, CHUNK_TAGS):
+            # Fallback to tag name for metadata nodes
+            group.append((node.get('name', node.tag), node.tag, node.get('inheritsFrom', None), raw_xml,
+                          root.get('name'), root.get('inheritsFrom')))
+            if len(group) >= SYNONYM_STREAM_GROUP:
+                yield from self._group_chunks(group, region)
+                group = []
+        yield from self._group_chunks(group, region)
+
+    def _group_chunks(self, group, region):
+        # Cached nodes cost nothing, the rest of the group is expanded concurrently
+        expansions = self.expand_synonyms_many([(name, raw_xml) for name, _, _, raw_xml, _, _ in group])
+        for (name, tag, inherits, raw_xml, manuscript, manuscript_inherits), dynamic_keywords in zip(group, expansions):
             lookup_key = f"{region}_{name}"
             static_keywords = self.semantic_bridge.get(lookup_key, self.semantic_bridge.get(name, "General Coverage"))
-            dynamic_keywords = self._expand_synonyms(name, raw_xml)
             
-            searchable_text = f"REGION: {region} | TAG: {node.tag} | ID: {name} | INTENT: {static_keywords} | COLLOQUIAL: {dynamic_keywords}"
+            searchable_text = f"REGION: {region} | TAG: {tag} | ID: {name} | INTENT: {static_keywords} | COLLOQUIAL: {dynamic_keywords}"
             
-            chunks.append({
-                "id": f"{region}_{node.tag}_{name}",
+            yield {
+                "id": f"{region}_{tag}_{name}",
                 "text": searchable_text, 
                 "metadata": {
                     "region": region, 
                     "name": name, 
-                    "tag": node.tag,
+                    "tag": tag,
                     "inheritsFrom": inherits,
+                    "manuscript": manuscript,
+                    "manuscriptInheritsFrom": manuscript_inherits,
                     "raw_xml": raw_xml 
                 }
-            })
-        return chunks
+            }
 
-    def run(self, files_config):
-        all_chunks = []
+    def _ingest(self, files_config, ingested):
         for region, path in files_config.items():
             if not os.path.exists(path): continue
             print(f"📂 Ingesting: {region}")
-            all_chunks.extend(self.chunk_xml(path, region))
-
-        texts = [c['text'] for c in all_chunks]
-        response = self.client.embeddings.create(input=texts, model="text-embedding-3-small")
-        vectors = [d.embedding for d in response.data]
+            ingested.append(region)
+            yield from self.iter_chunks(path, region)
 
-        os.makedirs("data/processed", exist_ok=True)
-        np.save(self.vectors_path, np.array(vectors))
-        with open(self.metadata_path, "w") as f:
-            json.dump(all_chunks, f, indent=2)
+    def run(self, files_config):
+        ingested = []
+        # Chunks stream from the parser into the embedder; only new or changed ones are embedded
+        all_chunks, vectors = embed_incremental(self._ingest(files_config, ingested), self.embeddings, self.index_dir)
+        if not all_chunks:
+            # Nothing ingested: publishing would replace the live index with an empty one
+            return
+        publish_build(self.index_dir, all_chunks, vectors, ingested, self.shard_by_region, build_ivf=self.build_ivf,
+                      ivf_nlist=self.ivf_nlist, build_hnsw=self.build_hnsw, hnsw_m=self.hnsw_m,
+                      hnsw_ef_construction=self.hnsw_ef_construction, quantize=self.quantize, pq_m=self.pq_m,
+                      attrs={"embedding_model": self.embeddings.model})
         print("✅ Indexing Complete.")
 
-class AetherEngine:
-    def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.metadata_path = "data/processed/metadata.json"
-        self.vectors_path = "data/processed/vectors.npy"
-        
-        with open(self.metadata_path, "r") as f:
-            self.metadata = json.load(f)
-        self.vectors = np.load(self.vectors_path)
+# Score cells (queries x chunks) per GEMM block in batch search, ~256 MB of float32 across all shards
+BATCH_SCORE_CELLS = 1 << 26
+# Metadata columns coded into per-value row arrays at load, usable as search filters
+PARTITION_FIELDS = ("region", "tag")
+# Filtered subsets up to this many rows are scanned exactly even when an ANN index exists
+FILTER_EXACT_ROWS = 50_000
+# Extra HNSW candidates fetched per requested hit when post-filtering graph results
+HNSW_FILTER_OVERFETCH = 4
+# Vector and BM25 candidates each fetched per requested hit before hybrid fusion
+HYBRID_OVERFETCH = 4
 
-    def _get_parent_node(self, parent_name):
-        for entry in self.metadata:
-            m = entry['metadata']
-            if m.get('name') == parent_name and m.get('region') in ['Global', 'Global_Base']:
-                return entry
+def _filter_values(value):
+    if value is None:
         return None
+    return (value,) if isinstance(value, str) else tuple(sorted(value))
 
-    def get_aether_result(self, query, threshold=0.30):
-        resp = self.client.embeddings.create(input=[query], model="text-embedding-3-small")
-        q_vec = np.array(resp.data[0].embedding)
-        
-        sims = np.dot(self.vectors, q_vec) / (np.linalg.norm(self.vectors, axis=1) * np.linalg.norm(q_vec))
-        idx = np.argmax(sims)
-        score = float(sims[idx])
-
-        # 🚨 SENTINEL JIRA TRIGGER: Explicitly flag for ticket creation if low score
-        if score < threshold:
-            return "ESCALATED", score, {
-                "id": "JIRA-PENDING",
-                "metadata": {
-                    "name": "GAP_DETECTED", 
-                    "raw_xml": "STATUS: No relevant policy found. Action: Create Ticket VRTS."
-                }
-            }
+class IndexShard:
+    """One index directory (container or legacy files, plus ANN side files) searched on its own.
+
+    Rows are local to the shard; `base` is the offset of its first row in the engine's
+    global row space. Search settings are read from the owning engine at query time.
+    """
+
+    def __init__(self, directory, base, engine):
+        self.directory = directory
+        self.base = base
+        self.engine = engine
+        self.index_path, self.metadata_path, self.vectors_path = index_files(directory)
+        self.ivf_path = os.path.join(directory, "ivf.npz")
+        self.hnsw_path = os.path.join(directory, "hnsw.npz")
+        self.quant_path = os.path.join(directory, "quant.npz")
+        self.lexical_path = os.path.join(directory, LEXICAL_FILE)
+        # Stamped before reading, so a file replaced mid-load shows up as a newer version
+        self.version = directory_version(directory)
+        # 🛡️ Opening the container maps the vectors and column tables in place (no JSON parse),
+        # so every worker shares the page cache; metadata rows are decoded only when read
+        self.metadata, self.vectors = load_index(self.index_path, self.metadata_path, self.vectors_path, engine.vector_dtype)
+        self.ivf = self._load_ivf() if engine.use_ivf else None
+        # int8/PQ codes are the hot index; full-precision rows are only touched to re-rank
+        self.quantized = self._load_quantized() if engine.use_quantized else None
+        # The HNSW graph is loaded on first query, not at startup; its file is opened now so the
+        # graph stays readable after this generation is pruned while the snapshot is still serving
+        self._hnsw_file = open(self.hnsw_path, "rb") if engine.use_hnsw_index and os.path.exists(self.hnsw_path) else None
+        self.use_hnsw = self._hnsw_file is not None
+        self._hnsw = None
+        self._hnsw_lock = threading.Lock()
+        self.lexical = self._load_lexical() if engine.lexical_weight else None
+
+    @property
+    def n_rows(self):
+        return self.vectors.shape[0]
+
+    def _load_ivf(self):
+        if not os.path.exists(self.ivf_path):
+            return None
+        ivf = IVFIndex.load(self.ivf_path)
+        if ivf.n_rows != self.n_rows:
+            print(f"⚠️ {self.ivf_path} covers {ivf.n_rows} rows, index has {self.n_rows}; using exact search")
+            return None
+        return ivf
+
+    def _load_quantized(self):
+        if not os.path.exists(self.quant_path):
+            return None
+        quantized = QuantizedIndex.load(self.quant_path)
+        if quantized.n_rows != self.n_rows:
+            print(f"⚠️ {self.quant_path} covers {quantized.n_rows} rows, index has {self.n_rows}; using exact search")
+            return None
+        return quantized
+
+    def _load_lexical(self):
+        if not os.path.exists(self.lexical_path):
+            return None
+        lexical = LexicalIndex.load(self.lexical_path)
+        if lexical.n_rows != self.n_rows:
+            print(f"⚠️ {self.lexical_path} covers {lexical.n_rows} rows, index has {self.n_rows}; vector-only search")
+            return None
+        return lexical
+
+    def _load_hnsw(self):
+        if self._hnsw is None and self.use_hnsw:
+            with self._hnsw_lock:
+                if self._hnsw is None and self.use_hnsw:
+                    with self._hnsw_file:
+                        hnsw = HNSWIndex.load(self._hnsw_file)
+                    if hnsw.n_rows == self.n_rows:
+                        self._hnsw = hnsw
+                    else:
+                        print(f"⚠️ {self.hnsw_path} covers {hnsw.n_rows} rows, index has {self.n_rows}; ignoring it")
+                        self.use_hnsw = False
+        return self._hnsw
+
+    def approximate(self):
+        return self._load_hnsw() is not None or self.ivf is not None or self.quantized is not None
+
+    def _row_mask(self, rows):
+        """Bool per shard row allowed by `rows`; built per query and only for the ANN paths."""
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[rows] = True
+        return mask
+
+    def _fuse(self, q_vec, terms, found, k, rows=None):
+        """Top k of the vector hits plus the BM25 candidates, scored cos + w * bm25 * (1 - cos).
+
+        `terms` are the query's technical IDs only, so the normalized BM25 score pulls exact
+        ID matches toward 1.0 while every chunk without one keeps its plain cosine.
+        """
+        candidates = np.union1d(found, self.lexical.candidates(terms, k * HYBRID_OVERFETCH, rows)).astype(np.intp)
+        if not len(candidates):
+            return candidates, np.empty(0, dtype=np.float32)
+        cos = score_rows(take_rows(self.vectors, candidates), q_vec)
+        fused = cos + self.engine.lexical_weight * self.lexical.score(terms, candidates) * (1 - cos)
+        top = top_k(fused, k)
+        return candidates[top], fused[top]
+
+    def search(self, q_vec, k, rows=None, terms=None, mask=None):
+        """(rows, scores) of the k best chunks for one unit-norm query, best first.
+
+        Uses the HNSW graph when one was built, else the IVF lists, else the quantized
+        codes with exact re-ranking, else an exact scan. `rows` is the shard's slice of
+        `filter_rows`; small filtered subsets are always scanned exactly. With query
+        `terms` and a BM25 index the vector hits are fused with lexical ones.
+        """
+        if terms and self.lexical is not None:
+            found, _ = self._vector_search(q_vec, k * HYBRID_OVERFETCH, rows, mask)
+            return self._fuse(q_vec, terms, found, k, rows)
+        return self._vector_search(q_vec, k, rows, mask)
+
+    def _vector_search(self, q_vec, k, rows=None, mask=None):
+        engine = self.engine
+        if rows is not None and (len(rows) <= FILTER_EXACT_ROWS or not self.approximate()):
+            sims = score_rows(take_rows(self.vectors, rows), q_vec)
+            top = top_k(sims, k)
+            return rows[top], sims[top]
+        if rows is not None and mask is None:
+            mask = self._row_mask(rows)
+        hnsw = self._load_hnsw()
+        if hnsw is not None:
+            if mask is None:
+                return hnsw.search(self.vectors, q_vec, k, engine.ef_search)
+            found, scores = hnsw.search(self.vectors, q_vec, k * HNSW_FILTER_OVERFETCH, max(engine.ef_search, k * HNSW_FILTER_OVERFETCH))
+            keep = mask[found]
+            if keep.sum() >= k:
+                return found[keep][:k], scores[keep][:k]
+            sims = score_rows(take_rows(self.vectors, rows), q_vec)
+            top = top_k(sims, k)
+            return rows[top], sims[top]
+        if self.ivf is not None:
+            return self.ivf.search(self.vectors, q_vec, k, engine.nprobe, mask)
+        if self.quantized is not None:
+            return self.quantized.search(self.vectors, q_vec, k, engine.rerank, mask)
+        sims = score_rows(self.vectors, q_vec)
+        top = top_k(sims, k)
+        return top, sims[top]
 
+    def search_batch(self, q_mat, k, rows=None, cells=BATCH_SCORE_CELLS, terms=None):
+        """`search` for every query row of `q_mat`; exact scans run as one GEMM per query block."""
+        terms = terms or [None] * len(q_mat)
+        if self.approximate() and (rows is None or len(rows) > FILTER_EXACT_ROWS):
+            mask = self._row_mask(rows) if rows is not None else None
+            return [self.search(q_vec, k, rows, t, mask) for q_vec, t in zip(q_mat, terms)]
+        if self.lexical is not None and any(terms):
+            found = self.search_batch(q_mat, k * HYBRID_OVERFETCH, rows, cells)
+            return [self._fuse(q_vec, t, f, k, rows) if t else (f[:k], s[:k])
+                    for q_vec, t, (f, s) in zip(q_mat, terms, found)]
+
+        matrix = self.vectors if rows is None else take_rows(self.vectors, rows)
+        results = []
+        block = max(1, cells // max(1, matrix.shape[0]))
+        for start in range(0, len(q_mat), block):
+            sims = score_rows(matrix, q_mat[start:start + block])
+            for row_sims, top in zip(sims, top_k_rows(sims, k)):
+                results.append((top if rows is None else rows[top], row_sims[top]))
+        return results
+
+def _gap_result(score):
+    # 🚨 SENTINEL JIRA TRIGGER: Explicitly flag for ticket creation if low score
+    return "ESCALATED", score, {
+        "id": "JIRA-PENDING",
+        "metadata": {
+            "name": "GAP_DETECTED", 
+            "raw_xml": "STATUS: No relevant policy found. Action: Create Ticket VRTS."
+        }
+    }
+
+class IndexSnapshot:
+    """Everything a query reads from one index generation: shards, partitions, lineage.
+
+    Never mutated after construction, so a query that grabbed a snapshot keeps a
+    consistent view (and its mappings alive) while the engine swaps in a new one.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        # The manifest is read once; a published generation directory never changes afterwards
+        manifest = read_manifest(engine.index_dir)
+        self.generation = manifest.get("generation")
+        self.root = manifest_index_dir(engine.index_dir, manifest)
+        shards, base = [], 0
+        for directory in index_dirs(self.root):
+            shard = IndexShard(directory, base, engine)
+            shards.append(shard)
+            base += shard.n_rows
+        self.shards = shards
+        self.metadata = shards[0].metadata if len(shards) == 1 else ShardedTable([s.metadata for s in shards])
+        # 🛡️ Region/tag partitions: filtered queries only score their own rows (and skip other shards)
+        self.partitions = {key: self.metadata.partition(key) for key in PARTITION_FIELDS}
+        self._filters = LRUCache(256)
+        # Parent lookup is a dict hit ((region, name) and name indexes); resolved lineage is
+        # memoized per index version, so a repeat hit on the same node is a dict lookup
+        self.version = (self.generation, tuple(s.version for s in shards))
+        # Queries must be embedded by the model the vectors came from (pre-attrs indexes: OpenAI)
+        models = [s.metadata.attrs.get("embedding_model", EMBEDDING_MODEL) for s in shards]
+        if len(set(models)) > 1:
+            print(f"⚠️ Shards were embedded with different models {sorted(set(models))}; querying with {models[0]}")
+        self.embedding_model = models[0]
+        self.lineage = LineageResolver.from_table(self.metadata, self.version)
+
+    def get_parent_node(self, parent_name):
+        row = self.lineage.find(parent_name, PARENT_REGIONS)
+        if row is None:
+            return None
+        parent = self.metadata[row]
+        parent["metadata"].pop(CONTENT_HASH_FIELD, None)
+        return parent
+
+    def filter_rows(self, region=None, tags=None):
+        """Sorted rows allowed by the region/tag filters, or None when unfiltered.
+
+        Only the row arrays are cached; a shard builds its bool mask per query, and only
+        when the filter is large enough to go through its ANN index.
+        """
+        key = (_filter_values(region), _filter_values(tags))
+        if key == (None, None):
+            return None
+        rows = self._filters.get(key)
+        if rows is None:
+            for field, values in zip(PARTITION_FIELDS, key):
+                if values is not None:
+                    part = self.partitions[field].rows_for(values)
+                    rows = part if rows is None else np.intersect1d(rows, part, assume_unique=True)
+            self._filters.put(key, rows)
+        return rows
+
+    def per_shard(self, fn, rows=None):
+        """[(shard, fn(shard, local rows))] over the shards the filter touches, in parallel."""
+        jobs = []
+        for shard in self.shards:
+            local_rows = None
+            if rows is not None:
+                lo, hi = np.searchsorted(rows, (shard.base, shard.base + shard.n_rows))
+                if lo == hi:
+                    continue
+                local_rows = rows[lo:hi] - shard.base
+            jobs.append((shard, local_rows))
+        if len(jobs) <= 1:
+            return [(job[0], fn(*job)) for job in jobs]
+        return list(zip([job[0] for job in jobs], self.engine.search_pool().map(lambda job: fn(*job), jobs)))
+
+    def search(self, q_vec, k, rows=None, terms=None):
+        """(global rows, scores) of the k best chunks for one unit-norm query, merged across shards."""
+        parts = self.per_shard(lambda shard, r: shard.search(q_vec, k, r, terms), rows)
+        return merge_top_k([(shard.base + found, scores) for shard, (found, scores) in parts], k)
+
+    def search_batch(self, q_mat, k, rows=None, terms=None):
+        """`search` for every row of `q_mat`; exact shards score each query block with one GEMM."""
+        cells = BATCH_SCORE_CELLS // len(self.shards)
+        parts = self.per_shard(lambda shard, r: shard.search_batch(q_mat, k, r, cells, terms), rows)
+        return [merge_top_k([(shard.base + found[i][0], found[i][1]) for shard, found in parts], k)
+                for i in range(len(q_mat))]
+
+    def resolve_hit(self, idx, score):
         result_node = self.metadata[idx]
-        inherits_from = result_node['metadata'].get('inheritsFrom')
+        # The content hash only drives incremental builds; payloads stay as they were before it
+        result_node["metadata"].pop(CONTENT_HASH_FIELD, None)
         
-        # 🛡️ SELF-HEALING & LINEAGE INJECTION
-        if inherits_from:
-            parent_entry = self._get_parent_node(inherits_from)
-            if parent_entry:
-                combined_xml = (
-                    f"### DATA_SOURCE_LINEAGE ###\n\n"
-                    f"[[ SOURCE_A: GLOBAL_BASE_LAYER ]]\n"
-                    f"ENTITY: {inherits_from}\n"
-                    f"CONTENT:\n{parent_entry['metadata'].get('raw_xml')}\n\n"
-                    f"[[ SOURCE_B: REGIONAL_OVERLAY ]]\n"
-                    f"ENTITY: {result_node['metadata']['name']}\n"
-                    f"REGION: {result_node['metadata']['region']}\n"
-                    f"CONTENT:\n{result_node['metadata'].get('raw_xml')}\n\n"
-                    f"### END_LINEAGE_DATA ###"
-                )
-                
-                healed_data = {"id": result_node["id"], "metadata": result_node["metadata"].copy()}
-                healed_data['metadata']['raw_xml'] = combined_xml
-                return "SUCCESS", 1.0, healed_data
-
-        return "SUCCESS", score, result_node
\ No newline at end of file
+        # 🛡️ SELF-HEALING & LINEAGE INJECTION (every inheritsFrom hop up to the global base;
+        # precomputed by the indexer, memoized walk for indexes built without it)
+        combined_xml = self.lineage.lineage(idx)
+        if combined_xml is not None:
+            healed_data = {"id": result_node["id"], "metadata": result_node["metadata"].copy()}
+            healed_data['metadata'].pop('lineage', None)
+            healed_data['metadata']['raw_xml'] = combined_xml
+            return "SUCCESS", 1.0, healed_data
+
+        return "SUCCESS", score, result_node
+
+    def rank(self, rows, scores, threshold):
+        if not len(rows) or scores[0] < threshold:
+            return [_gap_result(float(scores[0]) if len(rows) else 0.0)]
+        return [self.resolve_hit(idx, float(score)) for idx, score in zip(rows, scores) if score >= threshold]
+
+class AetherEngine:
+    def __init__(self, vector_dtype=np.float32, embedding_cache_path=EMBEDDING_CACHE_PATH,
+                 nprobe=8, use_ivf=True, ef_search=64, use_hnsw=True, use_quantized=True, rerank=10,
+                 search_workers=None, result_cache_size=1024, reload_interval=2.0, lexical_weight=0.5):
+        # Query embedding providers by model name; the live index decides which one is used
+        self._providers = {}
+        # Live generation named by data/processed/MANIFEST.json (or an index written in place there),
+        # either a single index or one shard per region
+        self.index_dir = "data/processed"
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self.rerank = rerank
+        self.vector_dtype = vector_dtype
+        self.use_ivf = use_ivf
+        self.use_quantized = use_quantized
+        self.use_hnsw_index = use_hnsw
+        # 🛡️ HYBRID: weight of the BM25 score fused into cosine (exact IDs like CA_LIA_Program); 0 disables it
+        self.lexical_weight = lexical_weight
+        # Shards are searched concurrently; BLAS releases the GIL, so threads use every core
+        self.search_workers = search_workers or min(32, os.cpu_count() or 1)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        # Query embeddings: in-process LRU + shared SQLite store, consulted before any API call
+        self.embedding_cache = EmbeddingCache(embedding_cache_path)
+        # Finished results keyed by (query, k, threshold, filters, index version); 0 disables it
+        self.result_cache = ResultCache(result_cache_size) if result_cache_size else None
+        # 🛡️ HOT RELOAD: at most every `reload_interval` seconds a query reads the manifest (or stats
+        # in-place index files); a new version is loaded in the background and swapped in whole
+        # (None disables it)
+        self.reload_interval = reload_interval
+        self._checked_at = time.monotonic()
+        self._reload_lock = threading.Lock()
+        self._load_index()
+
+    def _load_index(self):
+        try:
+            snapshot = IndexSnapshot(self)
+        except FileNotFoundError:
+            # The generation named by the manifest we read was pruned meanwhile; read it again
+            snapshot = IndexSnapshot(self)
+        self.snapshot = snapshot
+        # Keys carry the index version, so old entries could never hit again; free them now
+        if self.result_cache is not None:
+            self.result_cache.clear()
+
+    def reload(self):
+        """Re-reads the index files and rebuilds every derived lookup (partitions, parent map, ANN)."""
+        self._load_index()
+
+    def _index_changed(self, snapshot):
+        generation = read_manifest(self.index_dir).get("generation")
+        if generation is not None or snapshot.generation is not None:
+            return generation != snapshot.generation
+        return tuple(directory_version(d) for d in index_dirs(snapshot.root)) != snapshot.version[1]
+
+    def _background_reload(self):
+        try:
+            self._load_index()
+            print(f"🔄 Index reloaded ({len(self.snapshot.metadata)} chunks)")
+        except Exception as e:
+            # A half-written or broken index keeps the last good snapshot serving
+            print(f"⚠️ Index reload failed, still serving the previous version: {e}")
+        finally:
+            self._reload_lock.release()
+
+    def current_snapshot(self):
+        """The snapshot to run a query on; starts a background reload when the files changed."""
+        snapshot = self.snapshot
+        now = time.monotonic()
+        if self.reload_interval is None or now - self._checked_at < self.reload_interval:
+            return snapshot
+        self._checked_at = now
+        if self._reload_lock.acquire(blocking=False):
+            try:
+                changed = self._index_changed(snapshot)
+            except OSError:
+                changed = False
+            if changed:
+                threading.Thread(target=self._background_reload, daemon=True).start()
+            else:
+                self._reload_lock.release()
+        return snapshot
+
+    def search_pool(self):
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(self.search_workers)
+            return self._pool
+
+    @property
+    def metadata(self):
+        return self.snapshot.metadata
+
+    @property
+    def index_version(self):
+        return self.snapshot.version
+
+    def _get_parent_node(self, parent_name):
+        return self.snapshot.get_parent_node(parent_name)
+
+    def _provider(self, model):
+        if model not in self._providers:
+            self._providers[model] = cached(provider_for_model(model), self.embedding_cache)
+        return self._providers[model]
+
+    def _embed(self, texts, snapshot):
+        """Unit-norm (len(texts), d) query matrix; remote cache misses share one embeddings round-trip."""
+        return normalize_rows(self._provider(snapshot.embedding_model).embed(texts))
+
+    def _terms(self, query):
+        # ID-like terms only; a query without one is a plain vector search with plain cosine scores
+        return identifier_terms(query) if self.lexical_weight else None
+
+    def _result_key(self, query, k, threshold, region, tags, version):
+        return (normalize_text(query), k, threshold, _filter_values(region), _filter_values(tags), version)
+
+    def get_aether_results(self, query, k=5, threshold=0.30, region=None, tags=None):
+        """Top-k hits from a single scan as a list of (status, score, node), best first.
+
+        Hits scoring below `threshold` are dropped; if none survive, the list holds
+        the single ESCALATED gap result that `get_aether_result` returns. `region` and
+        `tags` (a value or a list of values) restrict scoring to those partitions.
+        Repeat inquiries against the same index version are served from the result cache.
+        """
+        snapshot = self.current_snapshot()
+        if self.result_cache is not None:
+            key = self._result_key(query, k, threshold, region, tags, snapshot.version)
+            hit = self.result_cache.get(key)
+            if hit is not None:
+                return hit
+        t0 = time.perf_counter()
+        q_vec = self._embed([query], snapshot)[0]
+        found = snapshot.search(q_vec, k, snapshot.filter_rows(region, tags), self._terms(query))
+        results = snapshot.rank(*found, threshold)
+        if self.result_cache is not None:
+            self.result_cache.put(key, results, (time.perf_counter() - t0) * 1000)
+        return results
+
+    def get_aether_results_batch(self, queries, k=5, threshold=0.30, region=None, tags=None):
+        """`get_aether_results` for many inquiries: one embeddings call, one GEMM per query block."""
+        queries = list(queries)
+        if not queries:
+            return []
+        snapshot = self.current_snapshot()
+        results = [None] * len(queries)
+        if self.result_cache is not None:
+            keys = [self._result_key(q, k, threshold, region, tags, snapshot.version) for q in queries]
+            results = [self.result_cache.get(key) for key in keys]
+        pending = [i for i, r in enumerate(results) if r is None]
+        if not pending:
+            return results
+
+        t0 = time.perf_counter()
+        q_mat = self._embed([queries[i] for i in pending], snapshot)
+        terms = [self._terms(queries[i]) for i in pending] if self.lexical_weight else None
+        found = snapshot.search_batch(q_mat, k, snapshot.filter_rows(region, tags), terms)
+        for i, (rows, scores) in zip(pending, found):
+            results[i] = snapshot.rank(rows, scores, threshold)
+        if self.result_cache is not None:
+            # The batch cost is shared evenly by the inquiries it answered
+            cost_ms = (time.perf_counter() - t0) * 1000 / len(pending)
+            for i in pending:
+                self.result_cache.put(keys[i], results[i], cost_ms)
+        return results
+
+    def get_aether_result(self, query, threshold=0.30, region=None, tags=None):
+        return self.get_aether_results(query, k=1, threshold=threshold, region=region, tags=tags)[0]
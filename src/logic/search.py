@@ -0,0 +1,537 @@
+import os
+import heapq
+import numpy as np
+from logic.store import normalize_rows
+
+# build_ivf="auto" scans corpora below this size exactly; the flat mat-vec is already sub-millisecond
+IVF_MIN_ROWS = 20_000
+
+# Rows per float16 scoring block; keeps the float32 upcast buffer around 64 MB at 1536 dims
+HALF_SCORE_BLOCK = 8192
+
+def score_rows(matrix, q_vec):
+    """Cosine scores of unit-norm queries against a unit-norm matrix.
+
+    A 1-D query is one mat-vec returning (N,); a (m, d) query block is one GEMM returning (m, N).
+    """
+    if matrix.dtype != np.float16:
+        return q_vec.astype(matrix.dtype, copy=False) @ matrix.T
+    # float16 has no BLAS path, so upcast in blocks instead of the whole matrix
+    sims = np.empty(q_vec.shape[:-1] + (matrix.shape[0],), dtype=np.float32)
+    for start in range(0, matrix.shape[0], HALF_SCORE_BLOCK):
+        block = matrix[start:start + HALF_SCORE_BLOCK].astype(np.float32)
+        sims[..., start:start + HALF_SCORE_BLOCK] = q_vec @ block.T
+    return sims
+
+def take_rows(vectors, rows):
+    """vectors[rows] for sorted `rows`; a contiguous run is returned as a zero-copy slice."""
+    if len(rows) and rows[-1] - rows[0] + 1 == len(rows):
+        return vectors[rows[0]:rows[-1] + 1]
+    return vectors[rows]
+
+def top_k(sims, k):
+    """Indices of the `k` best scores, best first: argpartition + sort of the survivors only."""
+    k = min(k, sims.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k < sims.shape[0]:
+        part = np.argpartition(sims, -k)[-k:]
+    else:
+        part = np.arange(sims.shape[0])
+    return part[np.argsort(sims[part])[::-1]]
+
+def top_k_rows(sims, k):
+    """Row-wise `top_k` over an (m, N) score block: returns (m, k) indices, best first."""
+    k = min(k, sims.shape[1])
+    if k <= 0:
+        return np.empty((sims.shape[0], 0), dtype=np.intp)
+    if k < sims.shape[1]:
+        part = np.argpartition(sims, -k, axis=1)[:, -k:]
+    else:
+        part = np.broadcast_to(np.arange(sims.shape[1]), sims.shape).copy()
+    order = np.argsort(np.take_along_axis(sims, part, axis=1), axis=1)[:, ::-1]
+    return np.take_along_axis(part, order, axis=1)
+
+def save_npz(path, **arrays):
+    """np.savez into a temp file that is then renamed over `path`.
+
+    In a staged generation `path` may be a hard link into the published one, which
+    must never be written through.
+    """
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+def _assign(x, centroids, block=65536):
+    assign = np.empty(x.shape[0], dtype=np.int32)
+    for start in range(0, x.shape[0], block):
+        assign[start:start + block] = np.argmax(score_rows(centroids, np.asarray(x[start:start + block], dtype=np.float32)), axis=1)
+    return assign
+
+def _cluster_sums(x, assign, n_clusters):
+    """Per-cluster row sums and counts via one sort + reduceat (no per-row Python work)."""
+    counts = np.bincount(assign, minlength=n_clusters)
+    order = np.argsort(assign, kind="stable")
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    filled = counts > 0
+    sums = np.zeros((n_clusters, x.shape[1]), dtype=np.float32)
+    sums[filled] = np.add.reduceat(x[order], starts[filled], axis=0)
+    return sums, counts
+
+def spherical_kmeans(x, n_clusters, iters=10, seed=0):
+    """k-means on the unit sphere (cosine); returns unit-norm float32 centroids."""
+    rng = np.random.default_rng(seed)
+    x = np.asarray(x, dtype=np.float32)
+    centroids = x[rng.choice(x.shape[0], n_clusters, replace=False)].copy()
+    for _ in range(iters):
+        assign = _assign(x, centroids)
+        sums, counts = _cluster_sums(x, assign, n_clusters)
+        filled = counts > 0
+        centroids[filled] = sums[filled]
+        # Re-seed empty clusters from random points so every list stays usable
+        empty = np.flatnonzero(~filled)
+        if len(empty):
+            centroids[empty] = x[rng.choice(x.shape[0], len(empty), replace=False)]
+        centroids = normalize_rows(centroids)
+    return centroids
+
+class IVFIndex:
+    """Inverted-file index: a k-means coarse quantizer plus one row list per centroid.
+
+    Lists are stored CSR-style (`offsets` into `rows`) so the whole index is three arrays.
+    A query scores the centroids, then only the rows of its `nprobe` nearest lists, plus
+    the `fresh` rows re-embedded since the lists were trained, which are always scanned.
+    """
+
+    def __init__(self, centroids, offsets, rows, fresh=None):
+        self.centroids = centroids
+        self.offsets = offsets
+        self.rows = rows
+        self.fresh = np.empty(0, dtype=np.int32) if fresh is None else fresh
+
+    @property
+    def n_rows(self):
+        return int(self.rows.shape[0] + self.fresh.shape[0])
+
+    @classmethod
+    def build(cls, vectors, nlist=None, iters=10, train_size=None, seed=0):
+        n = vectors.shape[0]
+        nlist = min(n, nlist or int(np.clip(4 * np.sqrt(n), 16, 65536)))
+        rng = np.random.default_rng(seed)
+        train_size = min(n, train_size or nlist * 64)
+        sample = np.sort(rng.choice(n, train_size, replace=False))
+        centroids = spherical_kmeans(vectors[sample], nlist, iters, seed)
+
+        assign = _assign(vectors, centroids)
+        rows = np.argsort(assign, kind="stable").astype(np.int32)
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(assign, minlength=nlist))]).astype(np.int64)
+        return cls(centroids, offsets, rows)
+
+    def save(self, path):
+        save_npz(path, centroids=self.centroids, offsets=self.offsets, rows=self.rows, fresh=self.fresh)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["centroids"], data["offsets"], data["rows"], data["fresh"] if "fresh" in data else None)
+
+    def update(self, row):
+        """Moves `row` to the fresh list after its vector changed; centroids and other lists stay as trained.
+
+        A healed vector is often far from every trained centroid, so it would not be probed
+        by the queries it was healed for; fresh rows are scored exactly on every query.
+        """
+        if row in self.fresh:
+            return
+        pos = int(np.flatnonzero(self.rows == row)[0])
+        self.rows = np.delete(self.rows, pos)
+        self.offsets = self.offsets.copy()
+        self.offsets[np.searchsorted(self.offsets, pos, side="right"):] -= 1
+        self.fresh = np.sort(np.append(self.fresh, row)).astype(np.int32)
+
+    def candidates(self, q_vec, nprobe):
+        probe = top_k(self.centroids @ q_vec, nprobe)
+        rows = [self.rows[self.offsets[c]:self.offsets[c + 1]] for c in probe] + [self.fresh]
+        # Sorted row ids turn the gather from the memory-mapped matrix into a forward scan
+        return np.sort(np.concatenate(rows))
+
+    def search(self, vectors, q_vec, k, nprobe=8, mask=None):
+        """Approximate top-k (rows, scores), best first, exact-scored within the probed lists.
+
+        `mask` (bool per row) drops filtered-out rows before they are scored.
+        """
+        rows = self.candidates(q_vec, nprobe)
+        if mask is not None:
+            rows = rows[mask[rows]]
+        scores = score_rows(vectors[rows], q_vec)
+        top = top_k(scores, k)
+        return rows[top], scores[top]
+
+def build_ivf_file(path, vectors, mode=False, nlist=None):
+    """Writes `path` next to the index when IVF is wanted, otherwise removes a stale one.
+
+    mode: True always builds, False never does, "auto" builds from IVF_MIN_ROWS chunks up.
+    """
+    if mode is True or (mode == "auto" and len(vectors) >= IVF_MIN_ROWS):
+        IVFIndex.build(normalize_rows(vectors), nlist).save(path)
+        return True
+    if os.path.exists(path):
+        os.remove(path)
+    return False
+
+def _search_layer(vectors, q_vec, entry_points, ef, neighbors_of):
+    """Best-first beam search over one graph layer; returns [(sim, node)] best first, at most `ef`."""
+    visited = set(entry_points)
+    sims = score_rows(vectors[np.asarray(entry_points)], q_vec)
+    candidates = [(-float(s), int(n)) for s, n in zip(sims, entry_points)]
+    results = [(float(s), int(n)) for s, n in zip(sims, entry_points)]
+    heapq.heapify(candidates)
+    heapq.heapify(results)
+    while len(results) > ef:
+        heapq.heappop(results)
+    while candidates:
+        neg_sim, node = heapq.heappop(candidates)
+        if -neg_sim < results[0][0] and len(results) >= ef:
+            break
+        fresh = [n for n in neighbors_of(node) if n not in visited]
+        if not fresh:
+            continue
+        visited.update(fresh)
+        for sim, n in zip(score_rows(vectors[np.asarray(fresh)], q_vec).tolist(), fresh):
+            if len(results) < ef or sim > results[0][0]:
+                heapq.heappush(candidates, (-sim, n))
+                heapq.heappush(results, (sim, n))
+                if len(results) > ef:
+                    heapq.heappop(results)
+    return sorted(results, reverse=True)
+
+def _select_neighbors(vectors, candidates, M):
+    """HNSW neighbour heuristic over [(sim, node)] best first.
+
+    A candidate is kept only if it is closer to the base node than to every neighbour
+    already kept, which preserves links between clusters; leftover slots are then
+    filled with the closest pruned candidates.
+    """
+    if len(candidates) <= M:
+        return [node for _, node in candidates]
+    nodes = np.asarray([node for _, node in candidates])
+    cand = vectors[nodes]
+    pairwise = score_rows(cand, cand)
+    # closest[i]: highest similarity between candidate i and any neighbour kept so far
+    closest = np.full(len(candidates), -np.inf, dtype=np.float32)
+    selected, pruned = [], []
+    for i, (sim, _) in enumerate(candidates):
+        if len(selected) >= M:
+            break
+        if sim <= closest[i]:
+            pruned.append(i)
+        else:
+            selected.append(i)
+            np.maximum(closest, pairwise[i], out=closest)
+    return nodes[selected + pruned[:M - len(selected)]].tolist()
+
+class HNSWIndex:
+    """Hierarchical navigable small-world graph over unit vectors (cosine).
+
+    Array-backed: `neighbors0` is an (N, 2M) int32 table for the base layer padded with -1,
+    and nodes above layer 0 own `levels[i]` consecutive rows of the (U, M) `upper` table
+    starting at `upper_start[i]`. The vectors themselves stay in the index container.
+    """
+
+    def __init__(self, levels, neighbors0, upper_start, upper, entry_point, M):
+        self.levels = levels
+        self.neighbors0 = neighbors0
+        self.upper_start = upper_start
+        self.upper = upper
+        self.entry_point = int(entry_point)
+        self.M = int(M)
+
+    @property
+    def n_rows(self):
+        return int(self.levels.shape[0])
+
+    def _row(self, node, level):
+        return self.neighbors0[node] if level == 0 else self.upper[self.upper_start[node] + level - 1]
+
+    def _neighbors(self, node, level):
+        row = self._row(node, level)
+        return row[row >= 0].tolist()
+
+    def _set_neighbors(self, node, level, nbrs):
+        row = self._row(node, level)
+        row[:] = -1
+        row[:len(nbrs)] = nbrs
+
+    @classmethod
+    def build(cls, vectors, M=16, ef_construction=100, seed=0):
+        n = vectors.shape[0]
+        rng = np.random.default_rng(seed)
+        levels = np.minimum(np.floor(-np.log(1.0 - rng.random(n)) / np.log(M)), 15).astype(np.int8)
+        graph = [dict() for _ in range(int(levels.max()) + 1 if n else 1)]
+        entry_point, max_level = 0, int(levels[0]) if n else 0
+
+        def link(node, level, candidates):
+            cap = 2 * M if level == 0 else M
+            graph[level][node] = _select_neighbors(vectors, candidates, M)
+            for nb in graph[level][node]:
+                nbrs = graph[level].setdefault(nb, [])
+                nbrs.append(node)
+                if len(nbrs) > cap:
+                    sims = score_rows(vectors[np.asarray(nbrs)], vectors[nb])
+                    ranked = sorted(zip(sims.tolist(), nbrs), reverse=True)
+                    graph[level][nb] = _select_neighbors(vectors, ranked, cap)
+
+        for level in range(max_level + 1):
+            graph[level][0] = []
+        for node in range(1, n):
+            q_vec = vectors[node]
+            level = int(levels[node])
+            cur = [entry_point]
+            for lc in range(max_level, level, -1):
+                cur = [_search_layer(vectors, q_vec, cur, 1, lambda x, lc=lc: graph[lc].get(x, []))[0][1]]
+            for lc in range(min(level, max_level), -1, -1):
+                found = _search_layer(vectors, q_vec, cur, ef_construction, lambda x, lc=lc: graph[lc].get(x, []))
+                link(node, lc, found)
+                cur = [c for _, c in found]
+            for lc in range(max_level + 1, level + 1):
+                graph[lc][node] = []
+            if level > max_level:
+                entry_point, max_level = node, level
+
+        neighbors0 = np.full((n, 2 * M), -1, dtype=np.int32)
+        for node, nbrs in graph[0].items():
+            neighbors0[node, :len(nbrs)] = nbrs
+        upper_start = np.full(n, -1, dtype=np.int32)
+        tall = np.flatnonzero(levels > 0)
+        upper = np.full((int(levels[tall].sum()), M), -1, dtype=np.int32)
+        cursor = 0
+        for node in tall:
+            upper_start[node] = cursor
+            for lc in range(1, int(levels[node]) + 1):
+                nbrs = graph[lc].get(int(node), [])
+                upper[cursor, :len(nbrs)] = nbrs
+                cursor += 1
+        return cls(levels, neighbors0, upper_start, upper, entry_point, M)
+
+    def save(self, path):
+        save_npz(path, levels=self.levels, neighbors0=self.neighbors0, upper_start=self.upper_start,
+                 upper=self.upper, entry_point=self.entry_point, M=self.M)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data["levels"], data["neighbors0"], data["upper_start"], data["upper"],
+                       data["entry_point"], data["M"])
+
+    def update(self, vectors, node, ef_construction=100):
+        """Re-links `node` after its vector changed, keeping its level.
+
+        On every layer it lives on the node gets fresh neighbours from a search with its
+        new vector, and each of them links back (re-pruned when its list is full). Links
+        still pointing at the node stay: they lead to a valid node either way.
+        """
+        if self.n_rows < 2:
+            return
+        q_vec = vectors[node]
+        top, level = int(self.levels[self.entry_point]), int(self.levels[node])
+        cur = [self.entry_point]
+        for lc in range(top, level, -1):
+            cur = [_search_layer(vectors, q_vec, cur, 1, lambda x, lc=lc: self._neighbors(x, lc))[0][1]]
+        for lc in range(min(level, top), -1, -1):
+            found = _search_layer(vectors, q_vec, cur, ef_construction + 1, lambda x, lc=lc: self._neighbors(x, lc))
+            cur = [n for _, n in found]
+            selected = _select_neighbors(vectors, [(s, n) for s, n in found if n != node], self.M)
+            self._set_neighbors(node, lc, selected)
+            cap = 2 * self.M if lc == 0 else self.M
+            for nb in selected:
+                nbrs = self._neighbors(nb, lc)
+                if node in nbrs:
+                    continue
+                nbrs.append(node)
+                if len(nbrs) > cap:
+                    sims = score_rows(vectors[np.asarray(nbrs)], vectors[nb])
+                    nbrs = _select_neighbors(vectors, sorted(zip(sims.tolist(), nbrs), reverse=True), cap)
+                self._set_neighbors(nb, lc, nbrs)
+
+    def search(self, vectors, q_vec, k, ef=64):
+        """Approximate top-k (rows, scores), best first; larger `ef` trades latency for recall."""
+        if self.n_rows == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        cur = [self.entry_point]
+        for lc in range(int(self.levels[self.entry_point]), 0, -1):
+            cur = [_search_layer(vectors, q_vec, cur, 1, lambda x, lc=lc: self._neighbors(x, lc))[0][1]]
+        found = _search_layer(vectors, q_vec, cur, max(ef, k), lambda x: self._neighbors(x, 0))[:k]
+        return np.array([n for _, n in found], dtype=np.int64), np.array([s for s, _ in found], dtype=np.float32)
+
+def build_hnsw_file(path, vectors, enabled=False, M=16, ef_construction=100):
+    """Writes the HNSW graph to `path` when enabled, otherwise removes a stale one."""
+    if enabled:
+        HNSWIndex.build(normalize_rows(vectors), M, ef_construction).save(path)
+        return True
+    if os.path.exists(path):
+        os.remove(path)
+    return False
+
+# Rows decoded per block when scoring quantized codes; bounds the float32 scratch buffer
+QUANT_SCORE_BLOCK = 16384
+
+def kmeans(x, n_clusters, iters=10, seed=0):
+    """Plain (Euclidean) k-means; used for the product-quantizer sub-codebooks."""
+    rng = np.random.default_rng(seed)
+    x = np.asarray(x, dtype=np.float32)
+    n_clusters = min(n_clusters, x.shape[0])
+    centroids = x[rng.choice(x.shape[0], n_clusters, replace=False)].copy()
+    for _ in range(iters):
+        dists = (centroids ** 2).sum(1)[None, :] - 2.0 * (x @ centroids.T)
+        assign = np.argmin(dists, axis=1)
+        sums, counts = _cluster_sums(x, assign, n_clusters)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+    return centroids
+
+class ScalarQuantizer:
+    """int8 codes with one scale per dimension: 4x smaller than float32, 8x smaller than float64."""
+
+    kind = "int8"
+
+    def __init__(self, codes, scale):
+        self.codes = codes
+        self.scale = scale
+
+    @classmethod
+    def build(cls, vectors):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        scale = np.abs(vectors).max(axis=0) / 127.0 if len(vectors) else np.ones(vectors.shape[1], np.float32)
+        scale[scale == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scale), -127, 127).astype(np.int8)
+        return cls(codes, scale.astype(np.float32))
+
+    def arrays(self):
+        return {"codes": self.codes, "scale": self.scale}
+
+    def encode(self, vectors):
+        return np.clip(np.rint(np.asarray(vectors, dtype=np.float32) / self.scale), -127, 127).astype(np.int8)
+
+    def scores(self, q_vec):
+        q_scaled = (q_vec * self.scale).astype(np.float32)
+        sims = np.empty(self.codes.shape[0], dtype=np.float32)
+        for start in range(0, self.codes.shape[0], QUANT_SCORE_BLOCK):
+            sims[start:start + QUANT_SCORE_BLOCK] = self.codes[start:start + QUANT_SCORE_BLOCK].astype(np.float32) @ q_scaled
+        return sims
+
+class ProductQuantizer:
+    """Product quantization: `m` sub-vectors, each replaced by one byte indexing a 256-entry codebook.
+
+    Scores use asymmetric distance computation: one (m, 256) lookup table per query,
+    then a gather-and-sum over the codes.
+    """
+
+    kind = "pq"
+
+    def __init__(self, codes, codebooks):
+        self.codes = codes
+        self.codebooks = codebooks
+
+    @classmethod
+    def build(cls, vectors, m=None, train_size=16384, iters=10, seed=0):
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n, dim = vectors.shape
+        m = m or (dim // 8 if dim % 8 == 0 else dim)
+        if dim % m:
+            raise ValueError(f"PQ needs m to divide the vector dimension ({dim} % {m} != 0)")
+        sub = dim // m
+        rng = np.random.default_rng(seed)
+        train = vectors[np.sort(rng.choice(n, min(n, train_size), replace=False))]
+        codebooks = np.zeros((m, 256, sub), dtype=np.float32)
+        codes = np.empty((n, m), dtype=np.uint8)
+        for j in range(m):
+            book = kmeans(train[:, j * sub:(j + 1) * sub], 256, iters, seed + j)
+            codebooks[j, :len(book)] = book
+            part = vectors[:, j * sub:(j + 1) * sub]
+            for start in range(0, n, QUANT_SCORE_BLOCK):
+                block = part[start:start + QUANT_SCORE_BLOCK]
+                dists = (book ** 2).sum(1)[None, :] - 2.0 * (block @ book.T)
+                codes[start:start + QUANT_SCORE_BLOCK, j] = np.argmin(dists, axis=1)
+        return cls(codes, codebooks)
+
+    def arrays(self):
+        return {"codes": self.codes, "codebooks": self.codebooks}
+
+    def encode(self, vectors):
+        """Nearest codebook entry per sub-vector of each row, with the trained codebooks."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        m, _, sub = self.codebooks.shape
+        parts = vectors.reshape(len(vectors), m, sub)
+        dists = (self.codebooks ** 2).sum(2)[None] - 2.0 * np.einsum("njs,jks->njk", parts, self.codebooks)
+        return np.argmin(dists, axis=2).astype(np.uint8)
+
+    def scores(self, q_vec):
+        m, _, sub = self.codebooks.shape
+        lut = np.einsum("jks,js->jk", self.codebooks, q_vec.reshape(m, sub).astype(np.float32))
+        cols = np.arange(m)
+        sims = np.empty(self.codes.shape[0], dtype=np.float32)
+        for start in range(0, self.codes.shape[0], QUANT_SCORE_BLOCK):
+            sims[start:start + QUANT_SCORE_BLOCK] = lut[cols, self.codes[start:start + QUANT_SCORE_BLOCK]].sum(axis=1)
+        return sims
+
+class QuantizedIndex:
+    """Compressed hot index: score every row from its codes, then re-rank a short candidate
+    list exactly against the full-precision (memory-mapped) vectors."""
+
+    def __init__(self, quantizer):
+        self.quantizer = quantizer
+
+    @property
+    def n_rows(self):
+        return int(self.quantizer.codes.shape[0])
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in self.quantizer.arrays().values())
+
+    @classmethod
+    def build(cls, vectors, kind="int8", pq_m=None):
+        if kind == "pq":
+            return cls(ProductQuantizer.build(vectors, pq_m))
+        if kind == "int8":
+            return cls(ScalarQuantizer.build(vectors))
+        raise ValueError(f"Unknown quantization kind: {kind}")
+
+    def update(self, vectors, row):
+        """Re-encodes `row` with the stored scale or codebooks after its vector changed."""
+        self.quantizer.codes[row] = self.quantizer.encode(vectors[row:row + 1])[0]
+
+    def save(self, path):
+        save_npz(path, kind=self.quantizer.kind, **self.quantizer.arrays())
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            if str(data["kind"]) == "pq":
+                return cls(ProductQuantizer(data["codes"], data["codebooks"]))
+            return cls(ScalarQuantizer(data["codes"], data["scale"]))
+
+    def search(self, vectors, q_vec, k, rerank=10, mask=None):
+        """Top-k (rows, scores), best first; `rerank * k` code-scored candidates are re-scored exactly.
+
+        `mask` (bool per row) excludes filtered-out rows from the candidate list.
+        """
+        approx = self.quantizer.scores(q_vec)
+        if mask is not None:
+            approx[~mask] = -np.inf
+        rows = np.sort(top_k(approx, max(k, k * rerank)))
+        if mask is not None:
+            rows = rows[mask[rows]]
+        scores = score_rows(vectors[rows], q_vec)
+        top = top_k(scores, k)
+        return rows[top], scores[top]
+
+def build_quant_file(path, vectors, kind=None, pq_m=None):
+    """Writes the quantized codes to `path` for kind "int8"/"pq", otherwise removes a stale file."""
+    if kind:
+        QuantizedIndex.build(normalize_rows(vectors), kind, pq_m).save(path)
+        return True
+    if os.path.exists(path):
+        os.remove(path)
+    return False
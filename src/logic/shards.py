@@ -0,0 +1,155 @@
+import os
+import shutil
+from bisect import bisect_right
+from itertools import chain
+import numpy as np
+from logic.store import Partition, normalize_rows, save_index
+from logic.search import IVFIndex, HNSWIndex, QuantizedIndex, build_ivf_file, build_hnsw_file, build_quant_file, top_k
+from logic.lexical import build_lexical_file
+
+INDEX_FILE = "index.aev"
+LEXICAL_FILE = "lexical.npz"
+# Per-region shards live in <index dir>/shards/<region>/, each a complete index directory
+SHARDS_DIR = "shards"
+
+def index_files(directory):
+    """(container, legacy metadata.json, legacy vectors.npy) paths of one index directory."""
+    return (os.path.join(directory, INDEX_FILE), os.path.join(directory, "metadata.json"),
+            os.path.join(directory, "vectors.npy"))
+
+# Files whose stamps make up an index directory's version
+VERSION_FILES = (INDEX_FILE, "metadata.json", "vectors.npy", "ivf.npz", "hnsw.npz", "quant.npz", LEXICAL_FILE)
+
+def directory_version(directory):
+    """(file, mtime_ns, size) of every index file present in `directory`; changes on any rewrite."""
+    version = []
+    for name in VERSION_FILES:
+        try:
+            st = os.stat(os.path.join(directory, name))
+        except FileNotFoundError:
+            continue
+        version.append((name, st.st_mtime_ns, st.st_size))
+    return tuple(version)
+
+def shard_dir(root, region):
+    return os.path.join(root, SHARDS_DIR, region)
+
+def index_dirs(root):
+    """Shard directories under `root` that hold an index, or [root] for a single index."""
+    base = os.path.join(root, SHARDS_DIR)
+    if os.path.isdir(base):
+        dirs = sorted(os.path.join(base, d) for d in os.listdir(base) if os.path.exists(os.path.join(base, d, INDEX_FILE)))
+        if dirs:
+            return dirs
+    return [root]
+
+def drop_shards(root, regions=None):
+    """Removes the shards of `regions` (all shards when None)."""
+    targets = [os.path.join(root, SHARDS_DIR)] if regions is None else [shard_dir(root, r) for r in regions]
+    for target in targets:
+        shutil.rmtree(target, ignore_errors=True)
+
+def write_index(directory, chunks, vectors, build_ivf=False, ivf_nlist=None, build_hnsw=False, hnsw_m=16,
+                hnsw_ef_construction=100, quantize=None, pq_m=None, attrs=None):
+    """Writes one index (container plus its IVF/HNSW/quantized/BM25 side files) into `directory`.
+
+    The directory is emptied first: in a staged generation its files may be hard links
+    into the published one, which must never be written through.
+    """
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+    save_index(os.path.join(directory, INDEX_FILE), chunks, vectors, attrs)
+    build_lexical_file(os.path.join(directory, LEXICAL_FILE), chunks)
+    build_ivf_file(os.path.join(directory, "ivf.npz"), vectors, build_ivf, ivf_nlist)
+    build_hnsw_file(os.path.join(directory, "hnsw.npz"), vectors, build_hnsw, hnsw_m, hnsw_ef_construction)
+    build_quant_file(os.path.join(directory, "quant.npz"), vectors, quantize, pq_m)
+
+def update_side_files(directory, vectors, row, hnsw_ef_construction=100):
+    """Re-indexes one changed row in the IVF/HNSW/quantized files present in `directory`.
+
+    Nothing is retrained: the row moves to the IVF fresh list, is re-encoded with the
+    stored int8 scale or PQ codebooks and re-linked in the HNSW graph.
+    """
+    vectors = normalize_rows(vectors)
+    for name, index_cls in (("ivf.npz", IVFIndex), ("hnsw.npz", HNSWIndex), ("quant.npz", QuantizedIndex)):
+        path = os.path.join(directory, name)
+        if not os.path.exists(path):
+            continue
+        index = index_cls.load(path)
+        if index_cls is IVFIndex:
+            index.update(row)
+        elif index_cls is HNSWIndex:
+            index.update(vectors, row, hnsw_ef_construction)
+        else:
+            index.update(vectors, row)
+        index.save(path)
+
+def group_by_region(chunks, vectors):
+    """{region: (chunks, vectors)} in first-seen order, rows kept in document order."""
+    vectors = np.asarray(vectors)
+    rows = {}
+    for row, c in enumerate(chunks):
+        rows.setdefault(c["metadata"]["region"], []).append(row)
+    return {region: ([chunks[r] for r in part], vectors[part]) for region, part in rows.items()}
+
+def merge_top_k(parts, k):
+    """Best k of per-shard (global rows, scores) pairs, best first."""
+    parts = [p for p in parts if len(p[0])]
+    if not parts:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+    if len(parts) == 1:
+        return parts[0]
+    rows = np.concatenate([p[0] for p in parts])
+    scores = np.concatenate([p[1] for p in parts])
+    top = top_k(scores, k)
+    return rows[top], scores[top]
+
+class ConcatColumn:
+    """One metadata column read across shards by global row."""
+
+    def __init__(self, columns, bases, n):
+        self.columns = columns
+        self.bases = bases
+        self._n = n
+
+    def __len__(self):
+        return self._n
+
+    def __iter__(self):
+        return chain.from_iterable(self.columns)
+
+    def __getitem__(self, idx):
+        idx = int(idx)
+        i = bisect_right(self.bases, idx) - 1
+        return self.columns[i][idx - self.bases[i]]
+
+class ShardedTable:
+    """ChunkTable interface over several shard tables; global row = shard base + local row."""
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.attrs = tables[0].attrs
+        self.bases = list(np.cumsum([0] + [len(t) for t in tables[:-1]]).tolist())
+        self._n = sum(len(t) for t in tables)
+
+    def __len__(self):
+        return self._n
+
+    def __iter__(self):
+        return chain.from_iterable(self.tables)
+
+    def __getitem__(self, idx):
+        idx = int(idx)
+        i = bisect_right(self.bases, idx) - 1
+        return self.tables[i][idx - self.bases[i]]
+
+    def column(self, key):
+        return ConcatColumn([t.column(key) for t in self.tables], self.bases, self._n)
+
+    def partition(self, key):
+        parts = [t.partition(key) for t in self.tables]
+        vocab = sorted({v for p in parts for v in p.vocab})
+        lookup = {v: i for i, v in enumerate(vocab)}
+        # Trailing -1 so a shard's missing-value code (-1) stays missing
+        codes = [np.array([lookup[v] for v in p.vocab] + [-1], dtype=np.int32)[p.codes] for p in parts]
+        return Partition(codes=np.concatenate(codes) if codes else np.empty(0, dtype=np.int32), vocab=vocab)
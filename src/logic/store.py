@@ -0,0 +1,416 @@
+import os
+import sys
+import json
+import mmap
+import struct
+import uuid
+import threading
+import numpy as np
+
+# Metadata fields with few distinct values; interned so every row shares one string object
+INTERNED_FIELDS = ("region", "tag", "name", "inheritsFrom", "manuscript", "manuscriptInheritsFrom")
+# Rows sampled from each end of a vector file to decide whether it is already unit-norm
+NORM_PROBE_ROWS = 1024
+
+# Single-file index container (index.aev), little-endian:
+#   header | pad to VECTOR_ALIGN | float32 vectors (n x dim) | 8-aligned column arrays | JSON schema
+# magic, format version, header size, rows, dim, vectors offset, schema offset, schema length
+INDEX_MAGIC = b"AETHIDX\0"
+INDEX_FORMAT_VERSION = 3
+# v1 containers (no blob columns) are still readable; a container without JSON columns is written as v2
+READABLE_FORMAT_VERSIONS = (1, 2, 3)
+INDEX_HEADER = struct.Struct("<8sIIQIxxxxQQQ")
+VECTOR_ALIGN = 4096
+# Low-cardinality fields stored as int32 codes into a vocabulary kept in the schema
+CATEGORY_FIELDS = ("region", "tag", "manuscript", "manuscriptInheritsFrom")
+# Large per-node payloads kept out of the container in a sibling blob file, read on demand
+BLOB_FIELDS = ("raw_xml", "lineage")
+BLOB_MAGIC = b"AETHBLB\0"
+# Per-row value state, stored only for columns where some row is not a plain value
+VALUE, NULL, ABSENT = 0, 1, 2
+
+def normalize_rows(vectors, dtype=np.float32):
+    """Returns a contiguous, unit-norm copy of `vectors` stored as `dtype`."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(vectors / norms, dtype=dtype)
+
+def _is_unit_norm(vectors):
+    if vectors.shape[0] == 0:
+        return True
+    probe = np.concatenate([vectors[:NORM_PROBE_ROWS], vectors[-NORM_PROBE_ROWS:]]).astype(np.float32)
+    norms = np.linalg.norm(probe, axis=1)
+    return bool(np.all((np.abs(norms - 1.0) < 1e-2) | (norms == 0)))
+
+def save_vectors(path, vectors):
+    """Writes unit-norm float32 rows so readers can memory-map the file as-is."""
+    np.save(path, normalize_rows(vectors) if len(vectors) else np.zeros((0, 0), dtype=np.float32))
+
+def load_vectors(path, dtype=np.float32):
+    """Opens `path` read-only through the page cache when it already holds unit-norm `dtype` rows.
+
+    Every process mapping the same file shares one physical copy. Legacy float64 files
+    (or a dtype change) fall back to a private normalized copy, as before.
+    """
+    vectors = np.load(path, mmap_mode="r")
+    if vectors.dtype == np.dtype(dtype) and vectors.flags.c_contiguous and _is_unit_norm(vectors):
+        return vectors
+    print(f"⚠️ {path} is not unit-norm {np.dtype(dtype).name}; normalizing in memory (re-index to share it)")
+    return normalize_rows(vectors, dtype)
+
+def save_metadata(path, chunks):
+    with open(path, "w") as f:
+        json.dump(chunks, f, separators=(",", ":"))
+
+class Partition:
+    """Integer-coded metadata column with one sorted row-index array per distinct value."""
+
+    def __init__(self, values=None, codes=None, vocab=None):
+        if codes is None:
+            vocab = sorted({v for v in values if v is not None})
+            lookup = {v: i for i, v in enumerate(vocab)}
+            codes = np.array([lookup.get(v, -1) for v in values], dtype=np.int32)
+        self.vocab = list(vocab)
+        self.codes = codes
+        order = np.argsort(self.codes, kind="stable")
+        bounds = np.searchsorted(self.codes[order], np.arange(len(self.vocab) + 1))
+        self.rows = {v: order[bounds[i]:bounds[i + 1]] for i, v in enumerate(self.vocab)}
+
+    def rows_for(self, values):
+        """Sorted row ids whose value is any of `values`."""
+        parts = [self.rows[v] for v in values if v in self.rows]
+        if not parts:
+            return np.empty(0, dtype=np.intp)
+        return parts[0] if len(parts) == 1 else np.sort(np.concatenate(parts))
+
+class ChunkTable:
+    """Column-oriented view of a legacy metadata.json.
+
+    Holds one list per field instead of two dicts per chunk, with repeated values
+    interned. Indexing returns the chunk dict in its original shape.
+    """
+
+    def __init__(self, chunks):
+        self.ids = [c["id"] for c in chunks]
+        self.texts = [c.get("text") for c in chunks]
+        # Build facts (e.g. embedding model) are only recorded by the index container
+        self.attrs = {}
+        keys = []
+        for c in chunks:
+            for key in c["metadata"]:
+                if key not in keys:
+                    keys.append(key)
+        self.columns = {}
+        for key in keys:
+            values = [c["metadata"].get(key) for c in chunks]
+            if key in INTERNED_FIELDS:
+                values = [sys.intern(v) if isinstance(v, str) else v for v in values]
+            self.columns[key] = values
+        # Chunks that never carried a key must not grow it when rebuilt
+        self.present = {
+            key: None if all(key in c["metadata"] for c in chunks) else {i for i, c in enumerate(chunks) if key in c["metadata"]}
+            for key in keys
+        }
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r") as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def column(self, key):
+        return self.columns.get(key, [None] * len(self))
+
+    def partition(self, key):
+        return Partition(self.column(key))
+
+    def __getitem__(self, idx):
+        idx = int(idx)
+        metadata = {}
+        for key, values in self.columns.items():
+            rows = self.present[key]
+            if rows is None or idx in rows:
+                metadata[key] = values[idx]
+        return {"id": self.ids[idx], "text": self.texts[idx], "metadata": metadata}
+
+def _pad(f, align):
+    f.write(b"\0" * (-f.tell() % align))
+
+def _write_array(f, array):
+    _pad(f, 8)
+    offset = f.tell()
+    f.write(np.ascontiguousarray(array).tobytes())
+    return [offset, array.dtype.str, int(array.size)]
+
+def _read_array(buf, spec):
+    offset, dtype, count = spec
+    return np.frombuffer(buf, dtype=np.dtype(dtype), count=count, offset=offset)
+
+def save_index(path, chunks, vectors, attrs=None):
+    """Writes chunks and their vectors as one versioned container, atomically replacing `path`.
+
+    Vectors are unit-norm float32 at a page-aligned offset so readers map them in place.
+    Low-cardinality fields become int32 codes; every other field is an offset table
+    into a UTF-8 heap, so opening the file parses only the small schema. BLOB_FIELDS
+    keep only their offset table here; the bytes go to a uniquely named blob file that
+    the schema points at, written before the container is swapped in. A field holding
+    any non-string value (number, bool, list, dict) is stored as JSON and read back
+    with its type; values JSON cannot encode are rejected. `attrs` (JSON values, e.g.
+    the embedding model) are stored in the schema.
+    """
+    vectors = normalize_rows(vectors) if len(vectors) else np.zeros((0, 0), dtype=np.float32)
+    n, dim = vectors.shape if len(chunks) else (0, 0)
+    keys = ["id", "text"]
+    for c in chunks:
+        for key in c["metadata"]:
+            if key not in keys:
+                keys.append(key)
+
+    directory = os.path.dirname(path)
+    previous_blobs = _blob_name(path)
+    blob_name = f"{os.path.splitext(os.path.basename(path))[0]}.{uuid.uuid4().hex[:12]}.blobs"
+    blob_file = None
+    tmp = f"{path}.tmp-{os.getpid()}"
+    with open(tmp, "wb") as f:
+        f.write(b"\0" * INDEX_HEADER.size)
+        _pad(f, VECTOR_ALIGN)
+        vectors_offset = f.tell()
+        f.write(vectors.tobytes())
+        columns = []
+        for key in keys:
+            values, states = [], np.zeros(n, dtype=np.uint8)
+            for row, c in enumerate(chunks):
+                source = c if key in ("id", "text") else c["metadata"]
+                value = source.get(key)
+                states[row] = ABSENT if key not in source else NULL if value is None else VALUE
+                values.append(value)
+            column = {"name": key}
+            if states.any():
+                column["states"] = _write_array(f, states)
+            if any(v is not None and not isinstance(v, str) for v in values):
+                try:
+                    encoded = [b"" if v is None else json.dumps(v, separators=(",", ":")).encode("utf-8") for v in values]
+                except (TypeError, ValueError) as e:
+                    raise TypeError(f"Metadata field {key!r} holds a value the index cannot store: {e}") from None
+                offsets = np.zeros(n + 1, dtype=np.int64)
+                offsets[1:] = np.cumsum([len(b) for b in encoded])
+                column["kind"] = "json"
+                column["offsets"] = _write_array(f, offsets)
+                column["heap"] = f.tell()
+                f.write(b"".join(encoded))
+            elif key in BLOB_FIELDS:
+                if blob_file is None:
+                    blob_file = open(os.path.join(directory, blob_name), "wb")
+                    blob_file.write(BLOB_MAGIC)
+                encoded = [b"" if v is None else v.encode("utf-8") for v in values]
+                offsets = np.full(n + 1, blob_file.tell(), dtype=np.int64)
+                offsets[1:] += np.cumsum([len(b) for b in encoded])
+                column["kind"] = "blob"
+                column["offsets"] = _write_array(f, offsets)
+                blob_file.write(b"".join(encoded))
+            elif key in CATEGORY_FIELDS:
+                vocab = sorted({v for v in values if v is not None})
+                lookup = {v: i for i, v in enumerate(vocab)}
+                column["kind"] = "category"
+                column["vocab"] = vocab
+                column["codes"] = _write_array(f, np.array([lookup.get(v, -1) for v in values], dtype=np.int32))
+            else:
+                encoded = [b"" if v is None else v.encode("utf-8") for v in values]
+                offsets = np.zeros(n + 1, dtype=np.int64)
+                offsets[1:] = np.cumsum([len(b) for b in encoded])
+                column["kind"] = "string"
+                column["offsets"] = _write_array(f, offsets)
+                column["heap"] = f.tell()
+                f.write(b"".join(encoded))
+            columns.append(column)
+        schema = {"columns": columns, "attrs": attrs or {}}
+        if blob_file is not None:
+            blob_file.close()
+            schema["blobs"] = blob_name
+        schema = json.dumps(schema, separators=(",", ":")).encode("utf-8")
+        schema_offset = f.tell()
+        f.write(schema)
+        f.seek(0)
+        # Readers that predate JSON columns can still open a container without any
+        version = INDEX_FORMAT_VERSION if any(c["kind"] == "json" for c in columns) else 2
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, version, INDEX_HEADER.size, n, dim,
+                                  vectors_offset, schema_offset, len(schema)))
+    os.replace(tmp, path)
+    # Readers that already opened the old blob file keep reading it through their handle
+    if previous_blobs is not None and previous_blobs != blob_name:
+        try:
+            os.remove(os.path.join(directory, previous_blobs))
+        except OSError:
+            pass
+
+def _blob_name(path):
+    """Blob file referenced by the container at `path`, or None."""
+    try:
+        with open(path, "rb") as f:
+            header = f.read(INDEX_HEADER.size)
+            magic, _, _, _, _, _, schema_offset, schema_len = INDEX_HEADER.unpack(header)
+            if magic != INDEX_MAGIC:
+                return None
+            f.seek(schema_offset)
+            return json.loads(f.read(schema_len)).get("blobs")
+    except (OSError, ValueError, struct.error):
+        return None
+
+class BlobFile:
+    """Random-access reads from a blob file; nothing is mapped or cached in-process."""
+
+    def __init__(self, path):
+        self._f = open(path, "rb")
+        self._lock = threading.Lock()
+        if self._f.read(len(BLOB_MAGIC)) != BLOB_MAGIC:
+            raise ValueError(f"{path} is not an AETHER blob file")
+
+    def read(self, offset, length):
+        if hasattr(os, "pread"):
+            return os.pread(self._f.fileno(), length, offset)
+        with self._lock:
+            self._f.seek(offset)
+            return self._f.read(length)
+
+class StringColumn:
+    """Variable-length strings decoded from the mapped heap only when a row is read."""
+
+    def __init__(self, buf, offsets, heap, states=None):
+        self._buf = buf
+        self.offsets = offsets
+        self.heap = heap
+        self.states = states
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __getitem__(self, idx):
+        idx = int(idx)
+        if self.states is not None and self.states[idx] != VALUE:
+            return None
+        return self._buf[self.heap + int(self.offsets[idx]):self.heap + int(self.offsets[idx + 1])].decode("utf-8")
+
+class JsonColumn(StringColumn):
+    """Non-string values (numbers, bools, lists, dicts) decoded from JSON in the heap when a row is read."""
+
+    def __getitem__(self, idx):
+        value = super().__getitem__(idx)
+        return None if value is None else json.loads(value)
+
+class BlobColumn(StringColumn):
+    """Strings fetched from the blob file by (offset, length) when a row is read."""
+
+    def __init__(self, blobs, offsets, states=None):
+        super().__init__(None, offsets, 0, states)
+        self.blobs = blobs
+
+    def __getitem__(self, idx):
+        idx = int(idx)
+        if self.states is not None and self.states[idx] != VALUE:
+            return None
+        start, end = int(self.offsets[idx]), int(self.offsets[idx + 1])
+        return self.blobs.read(start, end - start).decode("utf-8")
+
+class CategoryColumn:
+    """int32 codes into a shared vocabulary (-1 for None)."""
+
+    def __init__(self, codes, vocab, states=None):
+        self.codes = codes
+        self.vocab = [sys.intern(v) for v in vocab]
+        self.states = states
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def __getitem__(self, idx):
+        code = self.codes[int(idx)]
+        return None if code < 0 else self.vocab[code]
+
+class IndexFile:
+    """Read-only, memory-mapped view of an index container.
+
+    `vectors` is a zero-copy array over the mapping and `table` answers the same
+    calls as ChunkTable, decoding a row only when it is read. Blob fields (raw XML,
+    lineage) are read from the blob file with one pread per value.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _, n, dim, vectors_offset, schema_offset, schema_len = INDEX_HEADER.unpack_from(self._mm, 0)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{path} is not an AETHER index container")
+        if version not in READABLE_FORMAT_VERSIONS:
+            raise ValueError(f"{path} has index format v{version}, this build reads v{INDEX_FORMAT_VERSION}")
+        schema = json.loads(self._mm[schema_offset:schema_offset + schema_len])
+        self.vectors = np.frombuffer(self._mm, dtype=np.float32, count=n * dim, offset=vectors_offset).reshape(n, dim)
+        self.blobs = BlobFile(os.path.join(os.path.dirname(path), schema["blobs"])) if "blobs" in schema else None
+        self.attrs = schema.get("attrs", {})
+        self.table = IndexTable(self._mm, n, schema["columns"], self.blobs, self.attrs)
+
+class IndexTable:
+    """ChunkTable interface over the columns of an IndexFile."""
+
+    def __init__(self, buf, n, columns, blobs=None, attrs=None):
+        self._n = n
+        self.attrs = attrs or {}
+        self.columns = {}
+        for column in columns:
+            states = _read_array(buf, column["states"]) if "states" in column else None
+            if column["kind"] == "category":
+                values = CategoryColumn(_read_array(buf, column["codes"]), column["vocab"], states)
+            elif column["kind"] == "blob":
+                values = BlobColumn(blobs, _read_array(buf, column["offsets"]), states)
+            elif column["kind"] == "json":
+                values = JsonColumn(buf, _read_array(buf, column["offsets"]), column["heap"], states)
+            else:
+                values = StringColumn(buf, _read_array(buf, column["offsets"]), column["heap"], states)
+            self.columns[column["name"]] = values
+        self.ids = self.columns.pop("id")
+        self.texts = self.columns.pop("text")
+
+    def __len__(self):
+        return self._n
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def column(self, key):
+        return self.columns.get(key, [None] * len(self))
+
+    def partition(self, key):
+        values = self.columns.get(key)
+        if isinstance(values, CategoryColumn):
+            return Partition(codes=values.codes, vocab=values.vocab)
+        return Partition(self.column(key))
+
+    def __getitem__(self, idx):
+        idx = int(idx)
+        metadata = {}
+        for key, values in self.columns.items():
+            if values.states is None or values.states[idx] != ABSENT:
+                metadata[key] = values[idx]
+        return {"id": self.ids[idx], "text": self.texts[idx], "metadata": metadata}
+
+def load_index(index_path, metadata_path=None, vectors_path=None, dtype=np.float32):
+    """(table, vectors) from the index container, or from legacy metadata.json + vectors.npy."""
+    if os.path.exists(index_path):
+        index = IndexFile(index_path)
+        vectors = index.vectors if np.dtype(dtype) == np.float32 else normalize_rows(index.vectors, dtype)
+        return index.table, vectors
+    return ChunkTable.load(metadata_path), load_vectors(vectors_path, dtype)
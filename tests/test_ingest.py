@@ -0,0 +1,41 @@
+import os
+import lxml.etree as ET
+import pytest
+from logic.ingest import stream_elements
+
+MANUSCRIPTS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "manuscripts")
+
+NESTED = """<Manuscript name="Nested" inheritsFrom="Base">
+  <Coverage name="Outer">
+    <Factor name="Inner"/> tail of inner
+    <Coverage name="Deep"><Factor name="Deepest"/></Coverage>
+  </Coverage> tail of outer
+  <Other><Factor name="Sibling"/></Other>
+</Manuscript>
+"""
+
+def _xpath(path, tags):
+    tree = ET.parse(path)
+    query = " | ".join(f".//{tag}" for tag in tags)
+    return [(node.tag, node.get("name"), ET.tostring(node, encoding="unicode", pretty_print=True))
+            for node in tree.xpath(query)]
+
+def _streamed(path, tags):
+    return [(node.tag, node.get("name"), raw_xml) for _, node, raw_xml in stream_elements(path, tags)]
+
+@pytest.mark.parametrize("name", sorted(os.listdir(MANUSCRIPTS)))
+@pytest.mark.parametrize("tags", [("Coverage", "Factor"), ("Coverage", "Factor", "Governance_Rules", "LOB_Configuration")])
+def test_matches_xpath_on_the_manuscripts(name, tags):
+    path = os.path.join(MANUSCRIPTS, name)
+    assert _streamed(path, tags) == _xpath(path, tags)
+
+def test_nested_matches_keep_document_order_and_tails(tmp_path):
+    path = tmp_path / "nested.xml"
+    path.write_text(NESTED)
+    assert _streamed(str(path), ("Coverage", "Factor")) == _xpath(str(path), ("Coverage", "Factor"))
+
+def test_root_keeps_its_attributes(tmp_path):
+    path = tmp_path / "nested.xml"
+    path.write_text(NESTED)
+    root = next(stream_elements(str(path), ("Factor",)))[0]
+    assert (root.get("name"), root.get("inheritsFrom")) == ("Nested", "Base")
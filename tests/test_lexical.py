@@ -0,0 +1,45 @@
+import numpy as np
+from logic.lexical import LexicalIndex, identifier_terms, tokenize
+
+def _chunk(i, text, raw_xml=""):
+    return {"id": f"chunk_{i}", "text": text, "metadata": {"name": f"N{i}", "raw_xml": raw_xml}}
+
+CHUNKS = [
+    _chunk(0, "California Low Income Automobile program CA_LIA_Program"),
+    _chunk(1, "Safe driver discount SafeDriver"),
+    _chunk(2, "Form reference", '<Form id="GLB-PN-001"/>'),
+    _chunk(3, "Seismic surcharge CA_Seismic_Surcharge"),
+] + [_chunk(i, f"generic coverage text {i}") for i in range(4, 40)]
+
+def test_tokenize_keeps_ids_whole_and_in_pieces():
+    assert tokenize("CA_LIA_Program") == ["ca_lia_program", "ca", "lia", "program"]
+    assert tokenize("GLB-PN-001")[0] == "glb_pn_001"
+    assert identifier_terms("what is the CA_LIA_Program discount") == ["ca_lia_program"]
+
+def test_exact_id_match_scores_about_one():
+    index = LexicalIndex.build(CHUNKS)
+    rows = np.arange(len(CHUNKS))
+    scores = index.score(["ca_lia_program"], rows)
+    # Just under 1: the chunk is longer than average, which BM25 length normalization discounts
+    assert 0.75 < scores[0] <= 1.0
+    assert np.all(scores[1:] == 0)
+    assert np.all((scores >= 0) & (scores <= 1))
+
+def test_ids_inside_xml_are_indexed():
+    index = LexicalIndex.build(CHUNKS)
+    assert index.candidates(identifier_terms("GLB-PN-001"), 5).tolist() == [2]
+
+def test_candidates_respect_row_filter():
+    index = LexicalIndex.build(CHUNKS)
+    terms = identifier_terms("CA_LIA_Program CA_Seismic_Surcharge")
+    assert index.candidates(terms, 5).tolist() == [0, 3]
+    assert index.candidates(terms, 5, np.array([1, 3, 5])).tolist() == [3]
+
+def test_save_load_round_trip(tmp_path):
+    index = LexicalIndex.build(CHUNKS)
+    path = str(tmp_path / "lexical.npz")
+    index.save(path)
+    loaded = LexicalIndex.load(path)
+    rows = np.arange(len(CHUNKS))
+    assert loaded.n_rows == len(CHUNKS)
+    assert np.array_equal(loaded.score(["ca_lia_program"], rows), index.score(["ca_lia_program"], rows))
@@ -0,0 +1,112 @@
+import os
+import hashlib
+import pytest
+from logic.publish import GENERATIONS_DIR, current_index_dir, publish, publish_build, read_manifest
+from logic.shards import index_dirs
+from logic.embeddings import LocalEmbeddings
+from logic.indexer import AetherIndexer
+from logic.resolver import AetherEngine
+
+GLOBAL_XML = """<Manuscript name="Global_Base">
+  <Coverages>
+    <Coverage name="Comprehensive" deductible="500"/>
+    <Factor name="SafeDriver" multiplier="0.9"/>
+    <Factor name="HighMileage" multiplier="1.2"/>
+  </Coverages>
+</Manuscript>
+"""
+CA_XML = """<Manuscript name="CA_Overlay" inheritsFrom="Global_Base">
+  <Coverages>
+    <Coverage name="Comprehensive" inheritsFrom="Comprehensive" seismic="1.1"/>
+  </Coverages>
+</Manuscript>
+"""
+
+def _files(directory):
+    """{relative path: sha256} of every file under `directory`."""
+    found = {}
+    for base, _, names in os.walk(directory):
+        for name in names:
+            path = os.path.join(base, name)
+            with open(path, "rb") as f:
+                found[os.path.relpath(path, directory)] = hashlib.sha256(f.read()).hexdigest()
+    return found
+
+@pytest.fixture
+def manuscripts(tmp_path):
+    paths = {"Global": tmp_path / "global.xml", "CA": tmp_path / "ca.xml"}
+    paths["Global"].write_text(GLOBAL_XML)
+    paths["CA"].write_text(CA_XML)
+    return {region: str(path) for region, path in paths.items()}
+
+@pytest.fixture
+def root(tmp_path, monkeypatch):
+    # The engine reads data/processed relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    return tmp_path / "data" / "processed"
+
+def _indexer(root, **options):
+    indexer = AetherIndexer(embedding_provider="local", embedding_cache_path=None, **options)
+    indexer.index_dir = str(root)
+    return indexer
+
+def test_publish_numbers_generations_and_prunes(tmp_path):
+    for i in range(5):
+        with publish(str(tmp_path), keep=2) as staging:
+            with open(os.path.join(staging.path, "index.aev"), "w") as f:
+                f.write(str(i))
+    assert read_manifest(str(tmp_path))["generation"] == 5
+    assert sorted(os.listdir(tmp_path / GENERATIONS_DIR)) == ["gen-000004", "gen-000005"]
+    with open(os.path.join(current_index_dir(str(tmp_path)), "index.aev")) as f:
+        assert f.read() == "4"
+
+def test_cancelled_or_failed_builds_keep_the_live_generation(tmp_path):
+    with publish(str(tmp_path)) as staging:
+        open(os.path.join(staging.path, "index.aev"), "w").close()
+    with publish(str(tmp_path)) as staging:
+        staging.cancel()
+    with pytest.raises(RuntimeError):
+        with publish(str(tmp_path)):
+            raise RuntimeError("build failed")
+    assert read_manifest(str(tmp_path))["generation"] == 1
+    assert os.listdir(tmp_path / GENERATIONS_DIR) == ["gen-000001"]
+
+def test_carry_hard_links_untouched_shards(root, manuscripts):
+    _indexer(root, shard_by_region=True).run(manuscripts)
+    first = current_index_dir(str(root))
+    _indexer(root, shard_by_region=True).run({"CA": manuscripts["CA"]})
+    second = current_index_dir(str(root))
+    assert [os.path.basename(d) for d in index_dirs(second)] == ["CA", "Global"]
+    old, new = os.path.join(first, "shards", "Global", "index.aev"), os.path.join(second, "shards", "Global", "index.aev")
+    assert os.path.samefile(old, new)
+
+def test_heal_never_writes_through_the_published_generation(root, manuscripts):
+    indexer = _indexer(root, build_ivf=True, build_hnsw=True, quantize="int8")
+    indexer.run(manuscripts)
+    live = current_index_dir(str(root))
+    before = _files(live)
+    assert {"ivf.npz", "hnsw.npz", "quant.npz", "lexical.npz", "index.aev"} <= set(before)
+
+    assert indexer.re_index_node("HighMileage", "zebra quokka marmalade")
+    healed = current_index_dir(str(root))
+    assert healed != live
+    assert _files(live) == before
+    # Every healed file is a new inode; the graph of 4 nodes may well re-link to the same neighbours
+    for name in ("index.aev", "lexical.npz", "ivf.npz", "hnsw.npz", "quant.npz"):
+        assert not os.path.samefile(os.path.join(live, name), os.path.join(healed, name)), name
+    after = _files(healed)
+    for name in ("index.aev", "lexical.npz", "ivf.npz", "quant.npz"):
+        assert after[name] != before[name], name
+
+    engine = AetherEngine(embedding_cache_path=None, lexical_weight=0)
+    status, _, node = engine.get_aether_result("zebra quokka marmalade", threshold=0)
+    assert (status, node["id"]) == ("SUCCESS", "Global_HighMileage")
+
+def test_publish_build_materializes_lineage_for_a_single_index(root, manuscripts):
+    indexer = _indexer(root)
+    chunks = indexer.chunk_xml(manuscripts["Global"], "Global") + indexer.chunk_xml(manuscripts["CA"], "CA")
+    vectors = LocalEmbeddings().embed([c["text"] for c in chunks])
+    publish_build(str(root), chunks, vectors, ["Global", "CA"])
+    engine = AetherEngine(embedding_cache_path=None)
+    lineage = engine.metadata.column("lineage")
+    assert [row for row in range(len(lineage)) if lineage[row]] == [3]
@@ -0,0 +1,82 @@
+import os
+import numpy as np
+import pytest
+from logic import store
+from logic.store import INDEX_HEADER, load_index, save_index
+
+CHUNKS = [
+    {"id": "Global_A", "text": "alpha", "metadata": {"region": "Global", "name": "A", "inheritsFrom": None,
+                                                      "raw_xml": "<Coverage name=\"A\"/>", "weight": 2, "tags": ["x", "y"]}},
+    {"id": "CA_B", "text": None, "metadata": {"region": "CA", "name": "B", "inheritsFrom": "A", "raw_xml": None,
+                                              "lineage": "A -> B", "weight": 1.5}},
+    {"id": "CA_C", "text": "gamma", "metadata": {"region": None, "name": "C", "raw_xml": "<Factor name=\"C\"/>",
+                                                 "weight": None, "tags": {"k": True}}},
+]
+
+def _vectors(n, dim=8):
+    return np.random.default_rng(0).standard_normal((n, dim)).astype(np.float32)
+
+def _header(path):
+    with open(path, "rb") as f:
+        return INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+
+def test_round_trip_keeps_values_null_and_absent(tmp_path):
+    path = str(tmp_path / "index.aev")
+    save_index(path, CHUNKS, _vectors(3), {"embedding_model": "m"})
+    table, vectors = load_index(path)
+    assert list(table) == CHUNKS
+    assert table.attrs == {"embedding_model": "m"}
+    assert np.allclose(np.linalg.norm(vectors, axis=1), 1.0, atol=1e-5)
+    # NULL reads back as None, ABSENT keys stay missing
+    assert table[0]["metadata"]["inheritsFrom"] is None
+    assert "lineage" not in table[0]["metadata"]
+    assert "inheritsFrom" not in table[2]["metadata"]
+
+def test_blob_fields_live_in_the_blob_file(tmp_path):
+    path = str(tmp_path / "index.aev")
+    save_index(path, CHUNKS, _vectors(3))
+    blobs = [name for name in os.listdir(tmp_path) if name.endswith(".blobs")]
+    assert len(blobs) == 1
+    with open(path, "rb") as f:
+        assert b"<Coverage" not in f.read()
+    # A rewrite swaps in a new blob file and removes the old one
+    save_index(path, CHUNKS[:1], _vectors(1))
+    assert [name for name in os.listdir(tmp_path) if name.endswith(".blobs")] != blobs
+    assert load_index(path)[0][0]["metadata"]["raw_xml"] == "<Coverage name=\"A\"/>"
+
+def test_format_version_follows_json_columns(tmp_path):
+    path = str(tmp_path / "index.aev")
+    save_index(path, CHUNKS, _vectors(3))
+    assert _header(path)[1] == 3
+    strings = [{"id": c["id"], "text": c["text"], "metadata": {"name": c["metadata"]["name"]}} for c in CHUNKS]
+    save_index(path, strings, _vectors(3))
+    assert _header(path)[1] == 2
+
+def test_unstorable_value_is_rejected(tmp_path):
+    with pytest.raises(TypeError, match="weight"):
+        save_index(str(tmp_path / "index.aev"), [{"id": "a", "text": "t", "metadata": {"weight": {1, 2}}}], _vectors(1))
+
+def test_reads_v1_containers(tmp_path, monkeypatch):
+    # v1 had no blob columns: every field lived in the container heap
+    chunks = [{"id": c["id"], "text": c["text"], "metadata": {k: v for k, v in c["metadata"].items() if k not in ("weight", "tags")}}
+              for c in CHUNKS]
+    path = str(tmp_path / "index.aev")
+    monkeypatch.setattr(store, "BLOB_FIELDS", ())
+    save_index(path, chunks, _vectors(3))
+    monkeypatch.undo()
+    header = list(_header(path))
+    header[1] = 1
+    with open(path, "r+b") as f:
+        f.write(INDEX_HEADER.pack(*header))
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".blobs")]
+    assert list(load_index(path)[0]) == chunks
+
+def test_rejects_unknown_versions(tmp_path):
+    path = str(tmp_path / "index.aev")
+    save_index(path, CHUNKS, _vectors(3))
+    header = list(_header(path))
+    header[1] = 99
+    with open(path, "r+b") as f:
+        f.write(INDEX_HEADER.pack(*header))
+    with pytest.raises(ValueError, match="v99"):
+        load_index(path)